@@ -10,9 +10,22 @@ class Config:
     language: str = "en"
 
     stt_backend: str = "whisper_local"
-    tts_backend: str = "pyttsx3"
+    tts_backend: str = os.getenv("TTS_BACKEND", "pyttsx3")  # or "piper" (local neural voice)
+    tts_voice: str = os.getenv("TTS_VOICE", "")  # pyttsx3 voice name, or Piper .onnx voice
+    tts_cache: bool = os.getenv("TTS_CACHE", "1") == "1"  # replay rendered audio for repeated short phrases
     llm_backend: str = os.getenv("LLM_BACKEND", "perplexity")
     response_mode: str = os.getenv("RESPONSE_MODE", "voice")
+    stream_replies: bool = os.getenv("STREAM_REPLIES", "1") == "1"  # speak LLM replies sentence by sentence
+    llm_async: bool = os.getenv("LLM_ASYNC", "1") == "1"  # async LLM requests that can be cancelled mid-flight
+    llm_deadline_seconds: float = float(os.getenv("LLM_DEADLINE_SECONDS", "45"))
+    llm_fallbacks: str = os.getenv("LLM_FALLBACKS", "")  # e.g. "ollama": tried when the main backend fails
+    llm_hedge_seconds: float = float(os.getenv("LLM_HEDGE_SECONDS", "4"))  # ask a fallback if no first token by then; 0 = off
+    intent_classifier: bool = os.getenv("INTENT_CLASSIFIER", "1") == "1"  # match fuzzy commands locally before the LLM
+    intent_threshold: float = float(os.getenv("INTENT_THRESHOLD", "0.6"))
+    intent_embed_model: str = os.getenv("INTENT_EMBED_MODEL", "ngram")  # or a sentence-transformers model name
+    response_cache: bool = os.getenv("RESPONSE_CACHE", "1") == "1"  # reuse replies to repeated questions
+    response_cache_ttl: float = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+    context_tokens: int = int(os.getenv("CONTEXT_TOKENS", "0"))  # prompt token budget; 0 = per-backend default
 
     # API keys
     perplexity_api_key: str = os.getenv("PERPLEXITY_API_KEY", "")
@@ -22,6 +35,11 @@ class Config:
     hotkey: str = "ctrl+space"
     porcupine_access_key: str = os.getenv("PORCUPINE_ACCESS_KEY", "")
     wakeword_keyword: str = os.getenv("WAKEWORD_KEYWORD", "hey jarvis")  # openWakeWord model name
+    wake_pre_roll_ms: int = int(os.getenv("WAKE_PRE_ROLL_MS", "500"))  # audio kept from before detection
+
+    # Startup: load models on worker threads and run a dummy inference on each
+    parallel_startup: bool = os.getenv("PARALLEL_STARTUP", "1") == "1"
+    warmup_models: bool = os.getenv("WARMUP_MODELS", "1") == "1"
 
     # Audio / STT
     sample_rate: int = 16_000
@@ -29,6 +47,13 @@ class Config:
     stt_model_name: str = "small"
     stt_device: str = "cpu"
     stt_compute_type: str = "int8"
+    stt_streaming: bool = os.getenv("STT_STREAMING", "1") == "1"  # decode while the user speaks
+
+    # Recording: "endpoint" stops after trailing silence, "fixed" records a set duration
+    record_mode: str = os.getenv("RECORD_MODE", "endpoint")
+    endpoint_silence_ms: int = int(os.getenv("ENDPOINT_SILENCE_MS", "700"))
+    min_utterance_seconds: float = 0.5
+    max_utterance_seconds: float = float(os.getenv("MAX_UTTERANCE_SECONDS", "8.0"))
 
 
 def load_config() -> Config:
@@ -4,6 +4,7 @@ Low-level audio recording utilities for Echo Assistant.
 
 Responsibilities:
 - Interact with the system microphone
+- Keep one always-open input stream feeding a circular buffer
 - Record short clips of audio
 - Return audio as numpy arrays (float32, mono)
 - (Optional) Save audio to .wav for debugging
@@ -11,9 +12,10 @@ Responsibilities:
 
 from __future__ import annotations
 
+import threading
 import wave
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Iterator, List, Optional
 
 import numpy as np
 import sounddevice as sd
@@ -24,39 +26,411 @@ class AudioConfig:
     sample_rate: int = 16_000   # 16 kHz, good for speech + Whisper later
     channels: int = 1           # mono is enough for voice
     device: Optional[int] = None  # can be index or None for default
+    block_size: int = 1280      # frames per stream callback (80 ms at 16 kHz)
+    buffer_seconds: float = 30.0  # history kept in the ring buffer
 
 
-class AudioRecorder:
+@dataclass
+class EndpointConfig:
+    frame_ms: int = 30                   # analysis frame length
+    energy_threshold: float = 0.01       # minimum RMS counted as speech
+    noise_ratio: float = 3.0             # speech must be this many times the noise floor
+    trailing_silence_ms: int = 700       # stop after this much silence following speech
+    min_utterance_seconds: float = 0.5   # never stop earlier than this
+    max_utterance_seconds: float = 8.0   # hard cap on utterance length
+    start_timeout_seconds: float = 3.0   # give up if nobody starts talking
+
+
+class EnergyEndpointer:
+    """
+    Frame-energy end-of-utterance detector.
+
+    Feed fixed-size frames to `update()`; it returns True once the utterance
+    is over (trailing silence after speech, no speech at all, or max length).
+    The noise floor is tracked while waiting for speech so the threshold
+    adapts to the room.
+    """
+
+    def __init__(self, config: EndpointConfig, noise_floor: float = 0.0) -> None:
+        self.config = config
+        self.frame_seconds = config.frame_ms / 1000.0
+        self.noise_floor = noise_floor
+        self.speech_started = False
+        self.elapsed = 0.0
+        self.silence = 0.0
+
+    @property
+    def threshold(self) -> float:
+        return max(self.config.energy_threshold, self.noise_floor * self.config.noise_ratio)
+
+    def update(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(np.square(frame)))) if len(frame) else 0.0
+        self.elapsed += self.frame_seconds
+
+        if rms >= self.threshold:
+            self.speech_started = True
+            self.silence = 0.0
+        else:
+            self.silence += self.frame_seconds
+            if not self.speech_started:
+                # Slow-moving estimate of background level.
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+
+        cfg = self.config
+        if self.elapsed >= cfg.max_utterance_seconds:
+            return True
+        if not self.speech_started:
+            return self.elapsed >= cfg.start_timeout_seconds
+        return (
+            self.elapsed >= cfg.min_utterance_seconds
+            and self.silence * 1000.0 >= cfg.trailing_silence_ms
+        )
+
+
+class AudioRingBuffer:
+    """
+    Preallocated circular buffer of float32 mono frames.
+
+    Positions are absolute frame indices counted since the buffer was created,
+    so readers can remember "where they started" and come back later. Only the
+    most recent `capacity` frames are retained.
+
+    A single writer (the input stream callback) is assumed; any number of
+    readers may wait on it.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._written = 0
+        self._cond = threading.Condition()
+
+    @property
+    def frames_written(self) -> int:
+        """Absolute index one past the newest frame."""
+        return self._written
+
+    @property
+    def oldest_frame(self) -> int:
+        """Absolute index of the oldest frame still held in the buffer."""
+        return max(0, self._written - self.capacity)
+
+    def write(self, frames: np.ndarray) -> None:
+        """
+        Append frames, overwriting the oldest ones once the buffer is full.
+        """
+        n = len(frames)
+        if n == 0:
+            return
+        total = n
+        if n > self.capacity:
+            frames = frames[-self.capacity:]
+            n = self.capacity
+
+        start = (self._written + total - n) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self._data[start:end] = frames
+        else:
+            split = self.capacity - start
+            self._data[start:] = frames[:split]
+            self._data[: end - self.capacity] = frames[split:]
+
+        with self._cond:
+            self._written += total
+            self._cond.notify_all()
+
+    def wait_until(self, position: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until `position` frames have been written.
+
+        Returns False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written >= position, timeout=timeout)
+
+    def views(self, start: int, end: int) -> List[np.ndarray]:
+        """
+        Zero-copy views over absolute frame range [start, end).
+
+        Returns one view, or two when the range wraps around the end of the
+        buffer. Views alias the live buffer: they stay valid only until the
+        writer laps them (`capacity` frames later).
+        """
+        start = max(start, self.oldest_frame)
+        end = min(end, self._written)
+        if end <= start:
+            return []
+
+        s = start % self.capacity
+        e = s + (end - start)
+        if e <= self.capacity:
+            return [self._data[s:e]]
+        return [self._data[s:], self._data[: e - self.capacity]]
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Copy absolute frame range [start, end) into a new contiguous array.
+        """
+        parts = self.views(start, end)
+        if not parts:
+            return np.zeros(0, dtype=np.float32)
+        if len(parts) == 1:
+            return parts[0].copy()
+        return np.concatenate(parts)
+
+    def latest(self, num_frames: int) -> np.ndarray:
+        """Copy of the most recent `num_frames` frames."""
+        end = self._written
+        return self.read(end - num_frames, end)
+
+    def iter_chunks(
+        self,
+        start: int,
+        chunk_frames: int,
+        stop: Optional[threading.Event] = None,
+        timeout: float = 1.0,
+    ) -> Iterator[np.ndarray]:
+        """
+        Yield consecutive `chunk_frames`-sized chunks from `start` as they arrive.
+
+        Chunks are views when they do not straddle the wrap point, and copies
+        otherwise. Iteration ends when `stop` is set or no audio arrives within
+        `timeout` seconds.
+        """
+        pos = start
+        while stop is None or not stop.is_set():
+            if not self.wait_until(pos + chunk_frames, timeout=timeout):
+                return
+            if pos < self.oldest_frame:
+                # Reader fell behind by a full buffer; skip to the oldest data.
+                pos = self.oldest_frame
+            parts = self.views(pos, pos + chunk_frames)
+            yield parts[0] if len(parts) == 1 else np.concatenate(parts)
+            pos += chunk_frames
+
+
+FrameCallback = Callable[[np.ndarray], None]
+
+
+class MicrophoneStream:
+    """
+    Always-open `sd.InputStream` writing float32 mono frames into a ring buffer.
+
+    Opening the device once and leaving it running avoids paying the stream
+    open/close cost on every turn. Every captured block is also fanned out to
+    subscribers (e.g. the wake-word detector), so all consumers share one
+    device handle instead of each opening their own.
+    """
+
     def __init__(self, config: Optional[AudioConfig] = None) -> None:
         self.config = config or AudioConfig()
+        capacity = int(self.config.buffer_seconds * self.config.sample_rate)
+        self.ring = AudioRingBuffer(capacity)
+        self.overflows = 0
+        self._stream: Optional[sd.InputStream] = None
+        self._lock = threading.Lock()
+        self._subscribers: List[FrameCallback] = []
+
+    def subscribe(self, callback: FrameCallback) -> None:
+        """
+        Register `callback(block)` to receive every captured float32 mono block.
 
-    def record(self, seconds: float) -> np.ndarray:
+        Callbacks run on the audio thread and must return quickly; the block
+        is only valid for the duration of the call, so copy it if you keep it.
         """
-        Record audio from the default input device for `seconds` seconds.
+        with self._lock:
+            # Copy-on-write so the audio thread can iterate without locking.
+            self._subscribers = self._subscribers + [callback]
+
+    def unsubscribe(self, callback: FrameCallback) -> None:
+        with self._lock:
+            self._subscribers = [cb for cb in self._subscribers if cb is not callback]
+
+    @property
+    def active(self) -> bool:
+        return self._stream is not None
+
+    def start(self) -> None:
+        """Open the input stream (no-op if already running)."""
+        with self._lock:
+            if self._stream is not None:
+                return
+            self._stream = sd.InputStream(
+                samplerate=self.config.sample_rate,
+                channels=self.config.channels,
+                dtype="float32",
+                blocksize=self.config.block_size,
+                device=self.config.device,
+                callback=self._callback,
+            )
+            self._stream.start()
+            print(
+                f"[Audio] Input stream open at {self.config.sample_rate} Hz, "
+                f"buffer={self.config.buffer_seconds:.0f}s"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._stream is None:
+                return
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self) -> "MicrophoneStream":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _callback(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        # Runs on the PortAudio thread: keep it allocation-light.
+        if status and status.input_overflow:
+            self.overflows += 1
+        block = indata[:, 0] if indata.shape[1] == 1 else indata.mean(axis=1)
+        self.ring.write(block)
+        for callback in self._subscribers:
+            try:
+                callback(block)
+            except Exception as e:
+                print(f"[Audio] Subscriber error: {e}")
+
+
+class AudioRecorder:
+    def __init__(
+        self,
+        config: Optional[AudioConfig] = None,
+        stream: Optional[MicrophoneStream] = None,
+        endpoint: Optional[EndpointConfig] = None,
+    ) -> None:
+        self.config = config or AudioConfig()
+        self.stream = stream or MicrophoneStream(self.config)
+        self.endpoint = endpoint or EndpointConfig()
+
+    def _start_position(self, start: Optional[int]) -> int:
+        ring = self.stream.ring
+        if start is None:
+            return ring.frames_written
+        return max(start, ring.oldest_frame)
+
+    def record(self, seconds: float, start: Optional[int] = None) -> np.ndarray:
+        """
+        Record audio from the input stream for `seconds` seconds.
+
+        `start` is an absolute ring-buffer frame index to begin from; pass a
+        position in the past to include pre-roll audio already captured.
 
         Returns:
             np.ndarray of shape (num_samples,) with dtype float32, mono.
         """
         sr = self.config.sample_rate
-        ch = self.config.channels
-
-        print(f"[Audio] Recording {seconds:.2f}s at {sr} Hz, channels={ch} ...")
+        print(f"[Audio] Recording {seconds:.2f}s at {sr} Hz ...")
 
-        audio = sd.rec(
-            int(seconds * sr),
-            samplerate=sr,
-            channels=ch,
-            dtype="float32",
-            device=self.config.device,
-        )
-        sd.wait()  # block until finished
+        self.stream.start()
+        ring = self.stream.ring
+        end = ring.frames_written + int(seconds * sr)
+        start = self._start_position(start)
+        if not ring.wait_until(end, timeout=seconds + 2.0):
+            print("[Audio] Input stream stalled; returning partial audio.")
 
-        # audio shape: (num_samples, channels); we force mono 1D
-        audio = audio.squeeze()
+        audio = ring.read(start, end)
         print(f"[Audio] Recorded shape: {audio.shape}, dtype: {audio.dtype}")
 
         return audio
 
+    def iter_chunks(self, seconds: float, chunk_seconds: float = 0.1) -> Iterator[np.ndarray]:
+        """
+        Yield audio in `chunk_seconds` pieces as it is captured, for `seconds`
+        seconds total. Lets later stages start before capture ends.
+        """
+        sr = self.config.sample_rate
+        self.stream.start()
+        chunk_frames = max(1, int(chunk_seconds * sr))
+        num_chunks = int(np.ceil(seconds * sr / chunk_frames))
+        start = self.stream.ring.frames_written
+        for i, chunk in enumerate(self.stream.ring.iter_chunks(start, chunk_frames)):
+            yield chunk
+            if i + 1 >= num_chunks:
+                break
+
+    def iter_utterance(
+        self,
+        endpoint: Optional[EndpointConfig] = None,
+        start: Optional[int] = None,
+        live_from: Optional[int] = None,
+    ) -> Iterator[np.ndarray]:
+        """
+        Yield frames as they are captured until the speaker stops talking.
+
+        Capture ends after `trailing_silence_ms` of silence following speech,
+        bounded by the min/max utterance lengths in `endpoint`. `start` works
+        as in `record()`: buffered frames from there on are yielded first.
+
+        Frames before `live_from` (default: the current position) are pre-roll,
+        e.g. the tail of the wake word: they are yielded but don't count as
+        the start of speech, so a pause after the wake word doesn't end the
+        utterance. Speech onset, trailing silence and the start timeout are
+        all measured from `live_from`.
+        """
+        cfg = endpoint or self.endpoint
+        sr = self.config.sample_rate
+        self.stream.start()
+        ring = self.stream.ring
+
+        frame_len = max(1, int(sr * cfg.frame_ms / 1000))
+        start = self._start_position(start)
+        live_from = ring.frames_written if live_from is None else max(live_from, start)
+
+        # Estimate the noise floor from the second before we started. Use a low
+        # percentile of per-frame energy: with pre-roll that second usually
+        # contains the wake word itself.
+        lead_in = ring.read(start - sr, start)
+        usable = len(lead_in) - len(lead_in) % frame_len
+        if usable:
+            frame_rms = np.sqrt(np.mean(np.square(lead_in[:usable].reshape(-1, frame_len)), axis=1))
+            noise = float(np.percentile(frame_rms, 20))
+        else:
+            noise = 0.0
+        endpointer = EnergyEndpointer(cfg, noise_floor=noise)
+
+        position = start
+        for frame in ring.iter_chunks(start, frame_len):
+            yield frame
+            frame_start, position = position, position + len(frame)
+            if frame_start < live_from:
+                continue
+            if endpointer.update(frame):
+                break
+
+        print(
+            f"[Audio] Utterance ended after {endpointer.elapsed:.2f}s "
+            f"(speech={endpointer.speech_started})"
+        )
+
+    def record_utterance(
+        self,
+        endpoint: Optional[EndpointConfig] = None,
+        start: Optional[int] = None,
+        live_from: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Record until end of utterance instead of for a fixed duration.
+
+        Returns:
+            np.ndarray of shape (num_samples,) with dtype float32, mono.
+        """
+        frames = [frame.copy() for frame in self.iter_utterance(endpoint, start=start, live_from=live_from)]
+        if not frames:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(frames)
+
+    def close(self) -> None:
+        self.stream.close()
+
     @staticmethod
     def save_wav(path: str, audio: np.ndarray, sample_rate: int) -> None:
         """
@@ -85,6 +459,7 @@ def _demo_record_and_save():
     recorder = AudioRecorder(cfg)
 
     audio = recorder.record(seconds=3.0)
+    recorder.close()
     AudioRecorder.save_wav("test_recording.wav", audio, cfg.sample_rate)
     print("[Audio Demo] Done. Check 'test_recording.wav' in your current directory.")
 
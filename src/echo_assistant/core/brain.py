@@ -7,37 +7,119 @@ Later we'll add real backends (OpenAI, Ollama, etc.) behind the same API.
 """
 
 from __future__ import annotations
+import asyncio
+import json
 import os
-from dataclasses import dataclass
-from typing import List, Literal, Optional, Tuple
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .cache import ResponseCache, is_cacheable, normalize
+from .context import ConversationContext, Message, MessageRole  # noqa: F401
+from .failover import BackendSelector
 
-@dataclass
-class BrainConfig:
-    backend: str = "dummy"  # "dummy", "openai", "ollama", gemini, perplexity, etc. later
-    assistant_name: str = "E.C.H.O."
+PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+OPENAI_MODEL = "gpt-4.1-mini"   # or any model you prefer
+PERPLEXITY_KEY_MISSING = "Perplexity API key is missing. Set PERPLEXITY_API_KEY in your .env."
+
+
+async def _aclose_all(clients) -> None:
+    """Close async clients (httpx.AsyncClient.aclose, AsyncOpenAI.close)."""
+    for client in clients:
+        if client is None:
+            continue
+        close = getattr(client, "aclose", None) or client.close
+        await close()
 
 
-MessageRole = Literal["system", "user", "assistant"]
+class BackendError(RuntimeError):
+    """
+    A backend could not produce a reply. The message is meant to be spoken
+    to the user as-is.
+    """
 
 
 @dataclass
-class Message:
-    role: MessageRole
-    content: str
+class BrainConfig:
+    backend: str = "dummy"  # "dummy", "openai", "ollama", gemini, perplexity, etc. later
+    assistant_name: str = "E.C.H.O."
+    # Per-backend timeout (seconds) for connecting and for each streamed chunk
+    timeouts: Dict[str, float] = field(default_factory=lambda: {
+        "perplexity": 30.0,
+        "openai": 30.0,
+        "gemini": 30.0,
+        "ollama": 60.0,
+    })
+    # Reuse replies to repeated, self-contained questions (see cache.py)
+    cache_enabled: bool = True
+    cache_ttl_seconds: float = 3600.0
+    cache_max_entries: int = 256
+    # Skip the cache within this long of the previous turn: follow-ups like
+    # "why" or "and in French" depend on the conversation, not just the text
+    cache_context_seconds: float = 120.0
+    # Prompt token budget per backend (system + summary + history + new
+    # message); older turns are summarized to stay under it (see context.py)
+    context_budgets: Dict[str, int] = field(default_factory=lambda: {
+        "perplexity": 1500,
+        "openai": 3000,
+        "gemini": 3000,
+        "ollama": 1500,   # local prompt evaluation is the slow part on CPU
+    })
+    context_tokens: Optional[int] = None   # overrides context_budgets for every backend
+    summary_tokens: int = 300
+    # Backends tried, in order, when the primary fails or is cooling down
+    # after a failure (see failover.py)
+    fallbacks: List[str] = field(default_factory=list)
+    # Async replies: if the current backend hasn't produced its first token
+    # after this long (or its p95, if lower), also ask the next one. 0 = off.
+    hedge_after_seconds: float = 0.0
+    failover_cooldown_seconds: float = 30.0
 
 
 class Brain:
     def __init__(self, config: Optional[BrainConfig] = None) -> None:
         self.config = config or BrainConfig()
-        self.history: List[Message] = []
+
+        # Long-lived, lazily created clients: one pooled keep-alive HTTP
+        # session, one OpenAI client, one Gemini model per model name.
+        self._session = None
+        self._openai_client = None
+        self._gemini_models: Dict[str, Any] = {}
+        self._clients_lock = threading.Lock()
+        # Async clients are bound to the event loop that created them
+        self._async_loop = None
+        self._async_http = None
+        self._async_openai = None
+
+        self.selector = BackendSelector(
+            self.config.backend,
+            self.config.fallbacks,
+            hedge_after_seconds=self.config.hedge_after_seconds,
+            cooldown_seconds=self.config.failover_cooldown_seconds,
+        )
+
+        # The dummy brain answers instantly; caching it would only hide changes.
+        self.cache: Optional[ResponseCache] = None
+        if self.config.cache_enabled and self.config.backend != "dummy":
+            self.cache = ResponseCache(
+                ttl_seconds=self.config.cache_ttl_seconds,
+                max_entries=self.config.cache_max_entries,
+            )
 
         # simple system prompt for future LLMs
         self.system_prompt = (
             f"You are {self.config.assistant_name}, a desktop voice assistant. "
             "You respond concisely and helpfully."
         )
-        self.history.append(Message(role="system", content=self.system_prompt))
+        self.context = ConversationContext(
+            self.system_prompt,
+            budget=self._context_budget(self.config.backend),
+            summary_tokens=self.config.summary_tokens,
+            assistant_name=self.config.assistant_name,
+        )
+        self._last_turn_at: Optional[float] = None   # time.monotonic() of the last turn
 
     # Public API
     def generate_reply(self, user_text: str) -> str:
@@ -45,27 +127,244 @@ class Brain:
         if not user_text:
             return "I didn't hear anything."
 
+        cached = self._cached_reply(user_text)
+        if cached is not None:
+            return cached
+
+        errors: List[str] = []
+        for backend in self.selector.candidates():
+            started = time.monotonic()
+            try:
+                reply = self._call_backend(backend, user_text)
+            except Exception as e:
+                errors.append(self._backend_failed(backend, e))
+                continue
+            self.selector.record_success(backend, time.monotonic() - started)
+            self._cache_reply(user_text, reply, backend)
+            break
+        else:
+            reply = errors[0]
+
+        self._remember(user_text, reply)
+        return reply
+
+    def stream_reply(self, user_text: str) -> Iterator[str]:
+        """
+        Like generate_reply(), but yields the reply in pieces as the backend
+        produces them, so speech can start before generation finishes.
+        """
+        user_text = user_text.strip()
+        if not user_text:
+            yield "I didn't hear anything."
+            return
+
+        cached = self._cached_reply(user_text)
+        if cached is not None:
+            yield cached
+            return
+
+        parts: List[str] = []
+        errors: List[str] = []
         try:
-            if self.config.backend == "dummy":
-                reply = self._dummy_backend(user_text)
-            elif self.config.backend == "gemini":
-                reply = self._gemini_backend(user_text)
-            elif self.config.backend == "perplexity":
-                reply = self._perplexity_backend(user_text)
-            elif self.config.backend == "openai":
-                reply = self._openai_backend(user_text)
-            elif self.config.backend == "ollama":
-                reply = self._ollama_backend(user_text)
+            for backend in self.selector.candidates():
+                started = time.monotonic()
+                try:
+                    for piece in self._stream_backend(backend, user_text):
+                        if not piece:
+                            continue
+                        if not parts:
+                            self.selector.record_success(backend, time.monotonic() - started)
+                        parts.append(piece)
+                        yield piece
+                    if not parts:
+                        raise BackendError(f"The {backend} backend returned an empty reply.")
+                except GeneratorExit:
+                    raise
+                except Exception as e:
+                    error = self._backend_failed(backend, e)
+                    if not parts:
+                        # Nothing spoken yet: the next backend can still answer.
+                        errors.append(error)
+                        continue
+                    parts.append(error)
+                    yield error
+                    break
+                self._cache_reply(user_text, "".join(parts).strip(), backend)
+                break
             else:
-                reply = f"Backend '{self.config.backend}' is not implemented yet."
-        except Exception as e:
-            reply = f"There was an error talking to the {self.config.backend} backend: {e}"
-
-        self.history.append(Message(role="user", content=user_text))
-        self.history.append(Message(role="assistant", content=reply))
-        self._trim_history(max_messages=15)
+                parts.append(errors[0])
+                yield errors[0]
+        finally:
+            # Also runs when the consumer stops early (barge-in / cancel):
+            # keep whatever was actually said in the history.
+            if parts:
+                self._remember(user_text, "".join(parts).strip())
+
+    def _remember(self, user_text: str, reply: str) -> None:
+        self.context.add_turn(user_text, reply)
+        self._last_turn_at = time.monotonic()
+
+    def _backend_failed(self, backend: str, error: BaseException) -> str:
+        """Record a failure and return the message to speak if nothing else works."""
+        self.selector.record_failure(backend)
+        print(f"[Brain] {backend} failed: {error!r}")
+        if isinstance(error, BackendError):
+            return str(error)
+        if isinstance(error, asyncio.TimeoutError):
+            return f"The {backend} backend took too long to answer."
+        return f"There was an error talking to the {backend} backend: {error}"
+
+    def _context_budget(self, backend: str) -> int:
+        if self.config.context_tokens:
+            return self.config.context_tokens
+        return self.config.context_budgets.get(backend, 2000)
+
+    # ---- Response cache ----
+
+    def _cache_namespace(self, backend: str) -> str:
+        """Replies are only reused for the same backend and model."""
+        model = {
+            "openai": OPENAI_MODEL,
+            "gemini": os.getenv("GEMINI_MODEL", ""),
+            "perplexity": os.getenv("PERPLEXITY_MODEL", "sonar-reasoning"),
+            "ollama": os.getenv("OLLAMA_MODEL", "llama3.2"),
+        }.get(backend, "")
+        return f"{backend}:{model}"
+
+    def _cache_usable(self, user_text: str) -> bool:
+        """
+        Whether `user_text` may be answered from / stored in the cache: only
+        self-contained requests, and only when no recent turn could be what
+        the user is following up on.
+        """
+        if self.cache is None or not is_cacheable(user_text):
+            return False
+        if self._last_turn_at is None or not self.context.turns:
+            return True
+        return time.monotonic() - self._last_turn_at > self.config.cache_context_seconds
+
+    def _cached_reply(self, user_text: str) -> Optional[str]:
+        if not self._cache_usable(user_text):
+            return None
+        # Only the primary backend's answers are served from the cache.
+        reply = self.cache.get(self._cache_namespace(self.config.backend), user_text)
+        if reply is not None:
+            print(f"[Cache] Hit for {normalize(user_text)!r}")
+            self._remember(user_text, reply)
         return reply
 
+    def _cache_reply(self, user_text: str, reply: str, backend: str) -> None:
+        """Store a complete, successful reply."""
+        if not reply or not self._cache_usable(user_text):
+            return
+        try:
+            self.cache.put(self._cache_namespace(backend), user_text, reply)
+        except OSError as e:
+            print(f"[Cache] Could not save response cache: {e}")
+
+    def _call_backend(self, backend: str, user_text: str) -> str:
+        if backend == "dummy":
+            return self._dummy_backend(user_text)
+        elif backend == "gemini":
+            return self._gemini_backend(user_text)
+        elif backend == "perplexity":
+            return self._perplexity_backend(user_text)
+        elif backend == "openai":
+            return self._openai_backend(user_text)
+        elif backend == "ollama":
+            return self._ollama_backend(user_text)
+        raise BackendError(f"Backend '{backend}' is not implemented yet.")
+
+    def _stream_backend(self, backend: str, user_text: str) -> Iterator[str]:
+        if backend == "dummy":
+            yield self._dummy_backend(user_text)
+        elif backend == "gemini":
+            yield from self._gemini_stream(user_text)
+        elif backend == "perplexity":
+            yield from self._perplexity_stream(user_text)
+        elif backend == "openai":
+            yield from self._openai_stream(user_text)
+        elif backend == "ollama":
+            yield from self._ollama_stream(user_text)
+        else:
+            raise BackendError(f"Backend '{backend}' is not implemented yet.")
+
+    # ---- Clients ----
+
+    def _http(self):
+        """Shared keep-alive session so each turn reuses the TCP/TLS connection."""
+        if self._session is None:
+            with self._clients_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def _openai(self):
+        if self._openai_client is None:
+            with self._clients_lock:
+                if self._openai_client is None:
+                    from openai import OpenAI
+                    self._openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._openai_client
+
+    def _gemini_model(self, api_key: str, model_name: str):
+        with self._clients_lock:
+            model = self._gemini_models.get(model_name)
+            if model is None:
+                import google.generativeai as genai
+
+                if not self._gemini_models:
+                    genai.configure(api_key=api_key)
+                print(f"[Gemini] Using model: {model_name}")
+                model = genai.GenerativeModel(model_name)
+                self._gemini_models[model_name] = model
+        return model
+
+    def warmup(self) -> None:
+        """
+        Open the connection to the configured backend ahead of the first
+        request, so the first turn doesn't pay the TCP/TLS handshake.
+        """
+        backend = self.config.backend
+        if backend == "perplexity":
+            self._http().head("https://api.perplexity.ai", timeout=5)
+        elif backend == "ollama":
+            self._http().get(f"{OLLAMA_URL}/api/tags", timeout=5)
+        elif backend == "openai":
+            self._openai()
+
+    def close(self) -> None:
+        """
+        Write out the response cache and release pooled connections. Call
+        from a regular thread: async clients are closed on their own loop.
+        """
+        print(f"[Brain] Backend health: {self.selector.summary()}")
+        if self.cache is not None:
+            self.cache.flush()
+        with self._clients_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._openai_client is not None:
+                self._openai_client.close()
+                self._openai_client = None
+            self._gemini_models.clear()
+
+        loop, clients = self._async_loop, (self._async_openai, self._async_http)
+        self._async_loop = self._async_http = self._async_openai = None
+        if loop is not None and loop.is_running() and any(clients):
+            try:
+                asyncio.run_coroutine_threadsafe(_aclose_all(clients), loop).result(timeout=2.0)
+            except Exception as e:
+                print(f"[Brain] Could not close async clients: {e}")
+
     # ---- Backends ----
 
     def _dummy_backend(self, user_text: str) -> str:
@@ -99,63 +398,84 @@ class Brain:
         # fallback: simple echo with a bit of attitude
         return f"You said: {text}. I'm still a dummy brain; we'll upgrade me soon."
     
-    def _gemini_backend(self, user_text: str) -> str:
-        import google.generativeai as genai
-
+    def _gemini_settings(self) -> Tuple[str, str]:
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
-            return "Gemini API key is missing. Set GEMINI_API_KEY in your .env."
-
-        genai.configure(api_key=api_key)
+            raise BackendError("Gemini API key is missing. Set GEMINI_API_KEY in your .env.")
 
         # Use the exact model name from GEMINI_MODEL (e.g. 'models/gemini-pro')
         model_name = os.getenv("GEMINI_MODEL")
         if not model_name:
-            return "GEMINI_MODEL is not set. Use debug_gemini_models.py to pick one."
+            raise BackendError("GEMINI_MODEL is not set. Use debug_gemini_models.py to pick one.")
+        return api_key, model_name
 
+    def _gemini_backend(self, user_text: str) -> str:
+        model = self._gemini_model(*self._gemini_settings())
         try:
-            print(f"[Gemini] Using model: {model_name}")
-            model = genai.GenerativeModel(model_name)
             response = model.generate_content(user_text)
         except Exception as e:
-            return f"Gemini backend error: {e}"
+            raise BackendError(f"Gemini backend error: {e}") from e
 
         text = getattr(response, "text", None)
         if not text:
-            return "Gemini returned an empty response."
+            raise BackendError("Gemini returned an empty response.")
         return text.strip()
 
-    
-    def _perplexity_backend(self, user_text: str) -> str:
-        import requests, json
-
+    def _perplexity_request(self, user_text: str, stream: bool) -> Optional[Tuple[dict, dict]]:
+        """(headers, payload) for a Perplexity chat call, or None if no API key."""
         api_key = os.getenv("PERPLEXITY_API_KEY")
         model = os.getenv("PERPLEXITY_MODEL", "sonar-reasoning")
-
         if not api_key:
-            return "Perplexity API key is missing. Set PERPLEXITY_API_KEY in your .env."
+            return None
 
-        url = "https://api.perplexity.ai/chat/completions"
         headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
-
         payload = {
             "model": model,
-            "messages": [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": user_text},
-            ],
+            "messages": self._chat_messages(user_text, backend="perplexity"),
             # these fields are accepted by their OpenAI-compatible API
             "max_tokens": 500,
             "temperature": 0.7,
+            "stream": stream,
+        }
+        return headers, payload
+
+    def _chat_messages(self, user_text: str, backend: Optional[str] = None) -> List[dict]:
+        """
+        System prompt, conversation summary, recent history and the new user
+        turn, in OpenAI-style message format, within the backend's token budget.
+        """
+        budget = self._context_budget(backend or self.config.backend)
+        return self.context.build(user_text, budget=budget)
+
+    def _ollama_payload(self, user_text: str, stream: bool) -> dict:
+        return {
+            "model": os.getenv("OLLAMA_MODEL", "llama3.2"),
+            "messages": self._chat_messages(user_text, backend="ollama"),
+            "stream": stream,
         }
 
+    def _timeout(self, backend: str, deadline: Optional[float] = None) -> float:
+        """Backend timeout, capped by the time left until `deadline` (monotonic)."""
+        timeout = self.config.timeouts.get(backend, 30.0)
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        return max(timeout, 0.0)
+
+    def _perplexity_backend(self, user_text: str) -> str:
+        request = self._perplexity_request(user_text, stream=False)
+        if request is None:
+            raise BackendError(PERPLEXITY_KEY_MISSING)
+        headers, payload = request
+
         try:
-            resp = requests.post(url, headers=headers, json=payload, timeout=30)
+            resp = self._http().post(
+                PERPLEXITY_URL, headers=headers, json=payload, timeout=self._timeout("perplexity")
+            )
         except Exception as e:
-            return f"Perplexity request error (network): {e}"
+            raise BackendError(f"Perplexity request error (network): {e}") from e
 
         # If status is not 2xx, show the error body so we actually see what's wrong
         if not resp.ok:
@@ -163,56 +483,350 @@ class Brain:
                 err_json = resp.json()
             except Exception:
                 err_json = resp.text
-            return f"Perplexity API error {resp.status_code}: {err_json}"
+            raise BackendError(f"Perplexity API error {resp.status_code}: {err_json}")
 
         data = resp.json()
         try:
             return data["choices"][0]["message"]["content"].strip()
         except Exception:
-            return f"Unexpected Perplexity response format: {data}"
+            raise BackendError(f"Unexpected Perplexity response format: {data}")
 
     
     def _openai_backend(self, user_text: str) -> str:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-        # Build messages from history
-        msgs = [{"role": m.role, "content": m.content} for m in self.history]
-        msgs.append({"role": "user", "content": user_text})
+        client = self._openai()
 
         response = client.chat.completions.create(
-            model="gpt-4.1-mini",   # or any model you prefer
-            messages=msgs,
+            model=OPENAI_MODEL,
+            messages=self._chat_messages(user_text, backend="openai"),
             temperature=0.7,
+            timeout=self._timeout("openai"),
         )
         return response.choices[0].message.content
     
     def _ollama_backend(self, user_text: str) -> str:
-        import requests, json
-        model = os.getenv("OLLAMA_MODEL","llama3.2")
-
-        payload = {
-            "model": model,
-            "messages": [
-                {"role": m.role, "content": m.content} for m in self.history
-            ] + [{"role": "user", "content": user_text}],
-            "stream": False
-        }
-
-        r = requests.post("http://localhost:11434/api/chat", json=payload)
+        payload = self._ollama_payload(user_text, stream=False)
+        r = self._http().post(f"{OLLAMA_URL}/api/chat", json=payload, timeout=self._timeout("ollama"))
         data = r.json()
         return data["message"]["content"]
 
 
-    # ---- History mgmt ----
+    # ---- Streaming backends ----
+
+    def _gemini_stream(self, user_text: str) -> Iterator[str]:
+        model = self._gemini_model(*self._gemini_settings())
+        for chunk in model.generate_content(user_text, stream=True):
+            yield getattr(chunk, "text", "") or ""
+
+    def _perplexity_stream(self, user_text: str) -> Iterator[str]:
+        request = self._perplexity_request(user_text, stream=True)
+        if request is None:
+            raise BackendError(PERPLEXITY_KEY_MISSING)
+        headers, payload = request
+
+        with self._http().post(
+            PERPLEXITY_URL, headers=headers, json=payload,
+            timeout=self._timeout("perplexity"), stream=True,
+        ) as resp:
+            if not resp.ok:
+                raise BackendError(f"Perplexity API error {resp.status_code}: {resp.text}")
+            yield from _iter_sse_deltas(resp.iter_lines(decode_unicode=True))
+
+    def _openai_stream(self, user_text: str) -> Iterator[str]:
+        client = self._openai()
+
+        stream = client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=self._chat_messages(user_text, backend="openai"),
+            temperature=0.7,
+            stream=True,
+            timeout=self._timeout("openai"),
+        )
+        for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    def _ollama_stream(self, user_text: str) -> Iterator[str]:
+        payload = self._ollama_payload(user_text, stream=True)
+
+        # Ollama streams newline-delimited JSON objects
+        with self._http().post(
+            f"{OLLAMA_URL}/api/chat", json=payload, timeout=self._timeout("ollama"), stream=True
+        ) as r:
+            for line in r.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                data = json.loads(line)
+                yield data.get("message", {}).get("content", "")
+                if data.get("done"):
+                    break
+
+    # ---- Async API ----
+
+    async def agenerate_reply(self, user_text: str, deadline: Optional[float] = None) -> str:
+        """
+        Async counterpart of generate_reply(). Cancelling the awaiting task
+        aborts the HTTP request immediately.
+
+        `deadline` is an absolute time.monotonic() value; the reply is cut off
+        with a timeout message if the backend hasn't finished by then.
+        """
+        parts = [piece async for piece in self.astream_reply(user_text, deadline=deadline)]
+        return "".join(parts).strip()
 
-    def _trim_history(self, max_messages: int) -> None:
+    async def astream_reply(self, user_text: str, deadline: Optional[float] = None) -> AsyncIterator[str]:
         """
-        Keep history from growing indefinitely. Always keep the system prompt.
+        Async counterpart of stream_reply(). Each chunk must arrive within the
+        backend's timeout and before `deadline`.
         """
-        if len(self.history) <= max_messages:
+        user_text = user_text.strip()
+        if not user_text:
+            yield "I didn't hear anything."
             return
-        # keep first (system) + last N-1 messages
-        system = self.history[0]
-        tail = self.history[-(max_messages - 1):]
-        self.history = [system] + tail
+
+        cached = self._cached_reply(user_text)
+        if cached is not None:
+            yield cached
+            return
+
+        backend = self.config.backend
+        parts: List[str] = []
+        pieces = None
+        try:
+            backend, first, pieces = await self._afirst_reply(user_text, deadline)
+            parts.append(first)
+            yield first
+            while True:
+                try:
+                    piece = await asyncio.wait_for(
+                        pieces.__anext__(), timeout=self._timeout(backend, deadline)
+                    )
+                except StopAsyncIteration:
+                    break
+                if piece:
+                    parts.append(piece)
+                    yield piece
+            self._cache_reply(user_text, "".join(parts).strip(), backend)
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except Exception as e:
+            # Failures before the first piece were already recorded
+            if pieces is not None:
+                error = self._backend_failed(backend, e)
+            else:
+                error = str(e)
+            parts.append(error)
+            yield error
+        finally:
+            if pieces is not None:
+                await pieces.aclose()
+            if parts:
+                self._remember(user_text, "".join(parts).strip())
+
+    async def _afirst_reply(
+        self, user_text: str, deadline: Optional[float]
+    ) -> Tuple[str, str, AsyncIterator[str]]:
+        """
+        (backend, first piece, rest of the stream) from the first candidate
+        backend to start answering. A failed candidate falls over to the next
+        one at once; a slow one is hedged by also asking the next candidate
+        after selector.hedge_delay(), and whichever answers first wins; the
+        losers are recorded as abandoned with the time they had spent.
+        Raises BackendError with the first failure if every candidate fails.
+        """
+        waiting = self.selector.candidates()
+        pending: Dict["asyncio.Future", str] = {}
+        started: Dict["asyncio.Future", float] = {}
+        errors: List[str] = []
+        won = False
+
+        def launch() -> str:
+            backend = waiting.pop(0)
+            task = asyncio.ensure_future(self._afirst_piece(backend, user_text, deadline))
+            pending[task] = backend
+            started[task] = time.monotonic()
+            return backend
+
+        latest = launch()
+        try:
+            while pending:
+                hedge = self.selector.hedge_delay(latest) if waiting else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=hedge, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    print(f"[Brain] {latest} is slow; also asking {waiting[0]}")
+                    latest = launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    backend = pending.pop(task)
+                    try:
+                        first, pieces = task.result()
+                    except Exception as e:
+                        errors.append(self._backend_failed(backend, e))
+                        continue
+                    if winner is None:
+                        winner = (backend, first, pieces)
+                    else:
+                        await pieces.aclose()
+                if winner is not None:
+                    won = True
+                    return winner
+                if not pending and waiting:
+                    latest = launch()
+            raise BackendError(errors[0])
+        finally:
+            # Losers: abort their requests (one may have finished meanwhile)
+            losers = list(pending.items())
+            for task, _ in losers:
+                task.cancel()
+            results = await asyncio.gather(*(task for task, _ in losers), return_exceptions=True)
+            for (task, backend), result in zip(losers, results):
+                if isinstance(result, tuple):
+                    await result[1].aclose()
+                elif won and isinstance(result, asyncio.CancelledError):
+                    elapsed = time.monotonic() - started[task]
+                    print(f"[Brain] {backend} lost to a faster backend after {elapsed:.1f}s")
+                    self.selector.record_abandoned(backend, elapsed)
+
+    async def _afirst_piece(
+        self, backend: str, user_text: str, deadline: Optional[float]
+    ) -> Tuple[str, AsyncIterator[str]]:
+        """Open a stream on `backend` and wait for its first non-empty piece."""
+        started = time.monotonic()
+        pieces = self._astream_backend(backend, user_text, deadline)
+        try:
+            while True:
+                try:
+                    piece = await asyncio.wait_for(
+                        pieces.__anext__(), timeout=self._timeout(backend, deadline)
+                    )
+                except StopAsyncIteration:
+                    raise BackendError(f"The {backend} backend returned an empty reply.")
+                if piece:
+                    self.selector.record_success(backend, time.monotonic() - started)
+                    return piece, pieces
+        except BaseException:
+            await pieces.aclose()
+            raise
+
+    async def _astream_backend(
+        self, backend: str, user_text: str, deadline: Optional[float]
+    ) -> AsyncIterator[str]:
+        if backend == "dummy":
+            yield self._dummy_backend(user_text)
+        elif backend == "gemini":
+            async for piece in self._agemini_stream(user_text):
+                yield piece
+        elif backend == "perplexity":
+            async for piece in self._aperplexity_stream(user_text, deadline):
+                yield piece
+        elif backend == "openai":
+            async for piece in self._aopenai_stream(user_text, deadline):
+                yield piece
+        elif backend == "ollama":
+            async for piece in self._aollama_stream(user_text, deadline):
+                yield piece
+        else:
+            raise BackendError(f"Backend '{backend}' is not implemented yet.")
+
+    def _async_clients(self):
+        """
+        Pooled httpx.AsyncClient for the running loop, created once per loop
+        and reused with keep-alive (the async OpenAI client is reset with it).
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            import httpx
+
+            self._async_http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=4)
+            )
+            self._async_openai = None
+            self._async_loop = loop
+        return self._async_http
+
+    def _aopenai(self):
+        self._async_clients()
+        if self._async_openai is None:
+            from openai import AsyncOpenAI
+            self._async_openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._async_openai
+
+    async def _aperplexity_stream(self, user_text: str, deadline: Optional[float]) -> AsyncIterator[str]:
+        request = self._perplexity_request(user_text, stream=True)
+        if request is None:
+            raise BackendError(PERPLEXITY_KEY_MISSING)
+        headers, payload = request
+
+        client = self._async_clients()
+        timeout = self._timeout("perplexity", deadline)
+        async with client.stream(
+            "POST", PERPLEXITY_URL, headers=headers, json=payload, timeout=timeout
+        ) as resp:
+            if resp.status_code >= 400:
+                body = (await resp.aread()).decode("utf-8", errors="replace")
+                raise BackendError(f"Perplexity API error {resp.status_code}: {body}")
+            async for line in resp.aiter_lines():
+                delta = _sse_delta(line)
+                if delta:
+                    yield delta
+
+    async def _aopenai_stream(self, user_text: str, deadline: Optional[float]) -> AsyncIterator[str]:
+        client = self._aopenai()
+        stream = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=self._chat_messages(user_text, backend="openai"),
+            temperature=0.7,
+            stream=True,
+            timeout=self._timeout("openai", deadline),
+        )
+        async for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    async def _aollama_stream(self, user_text: str, deadline: Optional[float]) -> AsyncIterator[str]:
+        client = self._async_clients()
+        payload = self._ollama_payload(user_text, stream=True)
+        async with client.stream(
+            "POST", f"{OLLAMA_URL}/api/chat", json=payload, timeout=self._timeout("ollama", deadline)
+        ) as resp:
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                yield data.get("message", {}).get("content", "")
+                if data.get("done"):
+                    break
+
+    async def _agemini_stream(self, user_text: str) -> AsyncIterator[str]:
+        model = self._gemini_model(*self._gemini_settings())
+        response = await model.generate_content_async(user_text, stream=True)
+        async for chunk in response:
+            yield getattr(chunk, "text", "") or ""
+
+
+def _sse_delta(line: str) -> Optional[str]:
+    """
+    Content delta from one line of an OpenAI-compatible server-sent event
+    stream, or None for keep-alives, the [DONE] marker and malformed events.
+    """
+    if not line or not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return None
+    try:
+        event = json.loads(data)
+        return event["choices"][0]["delta"].get("content") or ""
+    except (ValueError, KeyError, IndexError):
+        return None
+
+
+def _iter_sse_deltas(lines: Iterable[str]) -> Iterator[str]:
+    """Content deltas from the lines of a server-sent event stream."""
+    for line in lines:
+        delta = _sse_delta(line)
+        if delta:
+            yield delta
@@ -0,0 +1,176 @@
+"""
+cache.py
+Response cache in front of the LLM backends.
+
+Responsibilities:
+- Answer repeated questions ("what can you do") without a network round trip
+- Key entries by normalized text, namespaced per backend/model
+- TTL expiry, LRU eviction, size limit, on-disk persistence (batched, written
+  on a background timer and at exit, never on the caller's thread)
+- Hit / miss statistics
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+CACHE_PATH = os.path.join(DATA_DIR, "response_cache.json")
+
+# Filler that doesn't change the meaning of a request
+_FILLER = {"please", "hey", "ok", "okay", "so", "um", "uh", "just", "echo", "jarvis"}
+
+# Answers to these depend on the moment or on the previous turn
+_VOLATILE = {
+    "time", "today", "tonight", "tomorrow", "yesterday", "now", "date", "latest",
+    "news", "current", "currently", "recent", "score",
+    "it", "that", "this", "he", "she", "him", "her", "they", "them", "again", "more",
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and filler words, collapse whitespace."""
+    words = re.sub(r"[^\w\s']", " ", text.lower()).split()
+    return " ".join(w for w in words if w not in _FILLER)
+
+
+def is_cacheable(text: str) -> bool:
+    words = normalize(text).split()
+    return bool(words) and not any(w.strip("'") in _VOLATILE for w in words)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: Optional[str] = CACHE_PATH,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 256,
+        save_delay_seconds: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # Stores within this window are written to disk together
+        self.save_delay_seconds = save_delay_seconds
+        # key -> (stored_at wall-clock, reply); order = recency
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()   # one file writer at a time
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+        if self.path:
+            atexit.register(self.flush)
+
+    @staticmethod
+    def _key(namespace: str, text: str) -> str:
+        return f"{namespace}\x1f{normalize(text)}"
+
+    def get(self, namespace: str, text: str) -> Optional[str]:
+        key = self._key(namespace, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, namespace: str, text: str, reply: str) -> None:
+        key = self._key(namespace, text)
+        with self._lock:
+            self._entries[key] = (time.time(), reply)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        self._schedule_save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self._schedule_save()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # ---- Persistence ----
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Cache] Ignoring unreadable cache file: {e}")
+            return
+        now = time.time()
+        for key, stored_at, reply in rows:
+            if now - stored_at <= self.ttl_seconds:
+                self._entries[key] = (stored_at, reply)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_save(self) -> None:
+        """Mark the cache dirty and start the background save timer if idle."""
+        if not self.path:
+            return
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay_seconds, self.flush)
+            self._save_timer.name = "echo-cache-save"
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes now (timer thread, shutdown)."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+        self.save()
+
+    def save(self) -> None:
+        """Write the whole cache to disk; blocks, so keep it off the event loop."""
+        if not self.path:
+            return
+        with self._write_lock:
+            with self._lock:
+                rows = [[key, stored_at, reply] for key, (stored_at, reply) in self._entries.items()]
+                self._dirty = False
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = self.path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(rows, f)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"[Cache] Could not save cache file: {e}")
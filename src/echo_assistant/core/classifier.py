@@ -0,0 +1,246 @@
+"""
+classifier.py
+Local, fuzzy intent classifier for commands the literal intent table misses
+("could you open github for me", "put on some lo-fi").
+
+Responsibilities:
+- Nearest-neighbour match of the utterance against example phrasings of
+  each intent, on the CPU, in a few milliseconds
+- Pull the skill argument out of the utterance using per-intent cue words
+- Penalise long or multi-clause arguments: "keep in mind I'm asking for a
+  friend, how do I fix a tire" is chat, not a fact to store
+- Only answer above a confidence threshold; otherwise leave it to the Brain
+
+Embeddings:
+- "ngram" (default): word / character n-gram count vectors. No model, no
+  extra dependency, catches rephrasings that share wording.
+- any sentence-transformers model name (e.g. "all-MiniLM-L6-v2"), if that
+  package is installed: better on paraphrases, ~100 MB of model.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .intents import Intent, IntentMatch
+
+# Politeness / filler around a command's argument
+_LEADING_FILLER = re.compile(r"^(?:(?:some|me|up|the)\s+)+", re.IGNORECASE)
+_TRAILING_FILLER = re.compile(
+    r"(?:[\s,]+(?:for me|please|now|right now|thanks|thank you))+[\s.!?]*$", re.IGNORECASE
+)
+
+# Utterances starting with one of these are questions ("how do you jot down
+# chords", "can you remember my sister's birthday?"), not commands
+_QUESTION_START = re.compile(
+    r"^(?:what|what's|why|how|when|where|who|whom|whose|which|"
+    r"can|could|would|will|should|shall|may|might|"
+    r"do|does|did|is|are|was|were|am|have|has|had)\b",
+    re.IGNORECASE,
+)
+
+
+# Clause boundaries inside an argument: punctuation, or a conjunction that
+# starts a new sentence ("... and tell me a riddle"), not a list ("rock and roll")
+_CLAUSE_BREAK = re.compile(
+    r"\s*[,;:?]\s*|\s+(?:and|but|so|because|then)\s+(?=(?:i|you|we|he|she|they|it|"
+    r"tell|show|give|let|help|how|what|why|when|where|who|which|can|could|would|do|does)\b)",
+    re.IGNORECASE,
+)
+
+# Fragments that ask for something ("any tips", "got any ideas")
+_ASKING = re.compile(r"^(?:any|anything|got any)\b", re.IGNORECASE)
+
+# Arguments starting with a verb mean the cue was the subject, not a command
+# ("google has how many employees", "play is good for kids")
+_VERB_START = re.compile(
+    r"^(?:is|are|was|were|has|have|had|does|did|will|can|could|would|should|"
+    r"says|said|makes|made|knows|wants|seems|gets|got)\b",
+    re.IGNORECASE,
+)
+
+# Arguments longer than this (in words) count against a fuzzy match
+MAX_ARGUMENT_WORDS = 8
+
+
+def is_question(text: str) -> bool:
+    """True if `text` is phrased as a question (wh-/auxiliary lead word or trailing "?")."""
+    text = text.strip()
+    return text.endswith("?") or bool(_QUESTION_START.match(text))
+
+
+def clauses(text: str) -> List[str]:
+    """Split `text` into clauses at punctuation and sentence-starting conjunctions."""
+    return [part for part in _CLAUSE_BREAK.split(text.strip()) if part.strip()]
+
+
+def asks_something(text: str) -> bool:
+    """True if any clause of `text` is a question or a request ("..., any tips")."""
+    return text.strip().endswith("?") or any(
+        is_question(c) or _ASKING.match(c) for c in clauses(text)
+    )
+
+
+def starts_with_verb(text: str) -> bool:
+    return bool(_VERB_START.match(text.strip()))
+
+
+def argument_penalty(argument: str) -> float:
+    """Score multiplier (<= 1) for arguments with several clauses or many words."""
+    extra_clauses = max(0, len(clauses(argument)) - 1)
+    extra_words = max(0, len(argument.split()) - MAX_ARGUMENT_WORDS)
+    return 0.85 ** extra_clauses * 0.95 ** extra_words
+
+
+def _ngrams(text: str) -> Counter:
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    grams: Counter = Counter(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    padded = f" {' '.join(words)} "
+    grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramEmbedder:
+    """Sparse, L2-normalised n-gram count vectors."""
+
+    def embed(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        vectors = []
+        for text in texts:
+            grams = _ngrams(text)
+            norm = math.sqrt(sum(v * v for v in grams.values())) or 1.0
+            vectors.append({g: v / norm for g, v in grams.items()})
+        return vectors
+
+    @staticmethod
+    def similarity(a: Dict[str, float], b: Dict[str, float]) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(v * b.get(g, 0.0) for g, v in a.items())
+
+
+class SentenceEmbedder:
+    """Dense sentence embeddings from a sentence-transformers model."""
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def embed(self, texts: Sequence[str]):
+        return list(self.model.encode(list(texts), normalize_embeddings=True))
+
+    @staticmethod
+    def similarity(a, b) -> float:
+        return float(a @ b)
+
+
+def make_embedder(name: str = "ngram"):
+    if not name or name == "ngram":
+        return NgramEmbedder()
+    return SentenceEmbedder(name)
+
+
+def _cue_pattern(cues: Sequence[str]) -> Optional[re.Pattern]:
+    if not cues:
+        return None
+    alternatives = sorted((c.lower() for c in cues), key=len, reverse=True)
+    return re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(c) for c in alternatives) + r")(?!\w)", re.IGNORECASE
+    )
+
+
+def extract_argument(text: str, cue_re: Optional[re.Pattern]) -> Tuple[str, str]:
+    """
+    Split `text` at the first cue into (frame, argument): the command wording
+    up to the cue, and the argument after it minus filler. ("", "") if no cue.
+    """
+    if cue_re is None:
+        return text, ""
+    m = cue_re.search(text)
+    if m is None:
+        return "", ""
+    rest = text[m.end():]
+    trailing = _TRAILING_FILLER.search(rest)
+    tail = trailing.group(0) if trailing else ""
+    argument = rest[: len(rest) - len(tail)].strip(" :,.!?")
+    argument = _LEADING_FILLER.sub("", argument).strip()
+    return text[: m.end()], argument
+
+
+def _template(text: str) -> str:
+    """A phrasing with its argument slot ("{}") removed, as compared by the embedder."""
+    return " ".join(text.replace("{}", " ").split())
+
+
+class IntentClassifier:
+    """
+    Scores each intent by its best example against the whole utterance with
+    that intent's argument taken out, so the argument's own words don't
+    dilute the match but wording before and after it still counts. The score
+    is then scaled down for long or multi-clause arguments.
+    """
+
+    def __init__(
+        self,
+        intents: Sequence[Intent],
+        threshold: float = 0.6,
+        embed_model: str = "ngram",
+    ) -> None:
+        self.intents = [i for i in intents if i.examples]
+        self.threshold = threshold
+        self.embed_model = embed_model
+        self.hits: Counter = Counter()
+        self._cues = {i.name: _cue_pattern(i.cues) for i in self.intents}
+        self._embedder = None
+        self._examples: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def warmup(self) -> None:
+        """Load the embedder and embed the examples (first classify() does it otherwise)."""
+        with self._lock:
+            if self._embedder is not None:
+                return
+            embedder = make_embedder(self.embed_model)
+            for intent in self.intents:
+                # Examples mark the argument with "{}"; compare templates to templates
+                templates = [_template(e) for e in intent.examples]
+                self._examples[intent.name] = embedder.embed(templates)
+            self._embedder = embedder
+
+    def classify(self, text: str) -> Optional[IntentMatch]:
+        text = text.strip()
+        if not text or not self.intents:
+            return None
+        self.warmup()
+
+        candidates: List[Tuple[Intent, str, str]] = []
+        for intent in self.intents:
+            frame, argument = extract_argument(text, self._cues[intent.name])
+            if not frame or (intent.requires_argument and not argument):
+                continue
+            # Keep what follows the argument ("... for me"); drop the filler before it
+            rest = text[len(frame):]
+            tail = rest[rest.find(argument) + len(argument):] if argument else rest
+            template = _template(f"{frame} {tail}")
+            candidates.append((intent, frame, argument, template))
+        if not candidates:
+            return None
+
+        vectors = self._embedder.embed([template for *_, template in candidates])
+        best: Optional[IntentMatch] = None
+        for (intent, frame, argument, _), vector in zip(candidates, vectors):
+            score = max(self._embedder.similarity(vector, e) for e in self._examples[intent.name])
+            score *= argument_penalty(argument)
+            if best is None or score > best.score:
+                best = IntentMatch(intent, frame, argument, score=score)
+
+        if best is None or best.score < self.threshold:
+            return None
+        with self._lock:
+            self.hits[best.intent.name] += 1
+        return best
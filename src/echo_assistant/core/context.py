@@ -0,0 +1,138 @@
+"""
+context.py
+Token-budgeted conversation context for the Brain.
+
+Responsibilities:
+- Track an estimated token count for every message
+- Keep the prompt sent to a backend under that backend's token budget
+- Fold the oldest turns into a short rolling summary instead of dropping them
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Literal, Optional
+
+MessageRole = Literal["system", "user", "assistant"]
+
+# Fixed per-message cost of the chat format (role markers, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count without loading a tokenizer: ~4 characters per token
+    for English, never less than one token per word.
+    """
+    if not text:
+        return 0
+    return max(len(text) // 4, len(text.split()))
+
+
+@dataclass
+class Message:
+    role: MessageRole
+    content: str
+    tokens: int = field(default=0, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _gist(text: str, max_chars: int) -> str:
+    """First sentence of `text`, cut to `max_chars`."""
+    text = " ".join(text.split())
+    first = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(first) > max_chars:
+        first = first[: max_chars - 3].rstrip() + "..."
+    return first
+
+
+class ConversationContext:
+    """
+    System prompt + rolling summary + the most recent turns.
+
+    Turns are added in user/assistant pairs. When the stored turns grow past
+    `budget`, the oldest pairs are compacted into one summary line each, and
+    the summary itself is capped at `summary_tokens` (oldest lines go first).
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        budget: int = 2000,
+        summary_tokens: int = 300,
+        assistant_name: str = "Assistant",
+    ) -> None:
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.summary_tokens = summary_tokens
+        self.assistant_name = assistant_name
+        self.turns: List[Message] = []
+        self.summary_lines: List[str] = []
+
+    # ---- Bookkeeping ----
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def system_message(self) -> Message:
+        content = self.system_prompt
+        if self.summary_lines:
+            content += "\n\nSummary of the earlier conversation:\n" + self.summary
+        return Message(role="system", content=content)
+
+    def tokens(self) -> int:
+        return self.system_message().tokens + sum(m.tokens for m in self.turns)
+
+    def add_turn(self, user_text: str, reply: str) -> None:
+        self.turns.append(Message(role="user", content=user_text))
+        self.turns.append(Message(role="assistant", content=reply))
+        self.compact()
+
+    def compact(self) -> None:
+        """Fold the oldest turns into the summary until we're under budget."""
+        while self.turns and self.tokens() > self.budget:
+            user, reply = self.turns[0], self.turns[1] if len(self.turns) > 1 else None
+            self.turns = self.turns[2:]
+            line = f"- User: {_gist(user.content, 120)}"
+            if reply is not None:
+                line += f" / {self.assistant_name}: {_gist(reply.content, 160)}"
+            self.summary_lines.append(line)
+
+        while (
+            len(self.summary_lines) > 1
+            and estimate_tokens(self.summary) > self.summary_tokens
+        ):
+            self.summary_lines.pop(0)
+
+    def clear(self) -> None:
+        self.turns = []
+        self.summary_lines = []
+
+    # ---- Prompt building ----
+
+    def build(self, user_text: str, budget: Optional[int] = None) -> List[dict]:
+        """
+        Messages for a chat request ending with `user_text`, newest turns
+        first in priority, within `budget` tokens (default: self.budget).
+        Only whole user/assistant pairs are included.
+        """
+        budget = self.budget if budget is None else budget
+        system = self.system_message()
+        user = Message(role="user", content=user_text)
+        remaining = budget - system.tokens - user.tokens
+
+        kept: List[Message] = []
+        for i in range(len(self.turns) - 2, -1, -2):
+            pair = self.turns[i:i + 2]
+            cost = sum(m.tokens for m in pair)
+            if cost > remaining:
+                break
+            kept[:0] = pair
+            remaining -= cost
+
+        return [{"role": m.role, "content": m.content} for m in [system, *kept, user]]
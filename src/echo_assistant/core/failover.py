@@ -0,0 +1,147 @@
+"""
+failover.py
+Backend health tracking for the Brain.
+
+Responsibilities:
+- Rolling per-backend latency (time to first token) and error rate
+- Order backends for a request: healthy ones first, in configured order;
+  a backend that just failed (or lost a hedge race) sits out a short
+  cool-down, and one that fails often goes behind the reliable ones
+- Decide how long to wait on a slow backend before hedging with the next
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+
+@dataclass
+class BackendStats:
+    window: int = 50
+    # Time to first token; abandoned requests count with the time they had spent
+    latencies: Deque[float] = field(default_factory=deque)
+    outcomes: Deque[bool] = field(default_factory=deque)     # True = success
+    consecutive_failures: int = 0
+    last_failure: float = 0.0   # selector clock
+
+    def record(self, ok: bool, latency: Optional[float] = None, now: float = 0.0) -> None:
+        self.outcomes.append(ok)
+        if len(self.outcomes) > self.window:
+            self.outcomes.popleft()
+        if latency is not None:
+            self.latencies.append(latency)
+            if len(self.latencies) > self.window:
+                self.latencies.popleft()
+        if ok:
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+            self.last_failure = now
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    @property
+    def p50(self) -> Optional[float]:
+        return self.percentile(0.50)
+
+    @property
+    def p95(self) -> Optional[float]:
+        return self.percentile(0.95)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / len(self.outcomes)
+
+
+class BackendSelector:
+    def __init__(
+        self,
+        primary: str,
+        fallbacks: Optional[List[str]] = None,
+        hedge_after_seconds: float = 0.0,
+        cooldown_seconds: float = 30.0,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.backends = [primary] + [b for b in (fallbacks or []) if b != primary]
+        self.hedge_after_seconds = hedge_after_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.clock = clock
+        self.stats: Dict[str, BackendStats] = {b: BackendStats() for b in self.backends}
+        self._lock = threading.Lock()
+
+    def record_success(self, backend: str, latency: float) -> None:
+        with self._lock:
+            self.stats.setdefault(backend, BackendStats()).record(True, latency)
+
+    def record_failure(self, backend: str, latency: Optional[float] = None) -> None:
+        with self._lock:
+            self.stats.setdefault(backend, BackendStats()).record(False, latency, self.clock())
+
+    def record_abandoned(self, backend: str, elapsed: float) -> None:
+        """
+        `backend` lost a hedge race and was cancelled after `elapsed` seconds
+        without a first token: a failure (it goes into cool-down) and a slow
+        latency sample, so a stalled primary stops being asked first.
+        """
+        self.record_failure(backend, elapsed)
+
+    def is_healthy(self, backend: str) -> bool:
+        stats = self.stats.get(backend)
+        if stats is None or stats.consecutive_failures == 0:
+            return True
+        return self.clock() - stats.last_failure > self.cooldown_seconds
+
+    def is_reliable(self, backend: str) -> bool:
+        """False once `backend` has enough history and fails too often."""
+        stats = self.stats.get(backend)
+        if stats is None or len(stats.outcomes) < self.min_samples:
+            return True
+        return stats.error_rate <= self.max_error_rate
+
+    def candidates(self) -> List[str]:
+        """
+        Backends to try, in order: healthy and reliable ones first, then
+        healthy ones with a high error rate, cooling-down ones last.
+        """
+        with self._lock:
+            healthy = [b for b in self.backends if self.is_healthy(b)]
+            reliable = [b for b in healthy if self.is_reliable(b)]
+            flaky = [b for b in healthy if b not in reliable]
+            return reliable + flaky + [b for b in self.backends if b not in healthy]
+
+    def hedge_delay(self, backend: str) -> Optional[float]:
+        """
+        Seconds to wait for `backend`'s first token before also asking the
+        next candidate: its p95 once there's enough history, capped by
+        hedge_after_seconds. None if hedging is disabled.
+        """
+        if self.hedge_after_seconds <= 0 or len(self.backends) < 2:
+            return None
+        with self._lock:
+            stats = self.stats.get(backend)
+            if stats is None or len(stats.latencies) < self.min_samples:
+                return self.hedge_after_seconds
+            return min(self.hedge_after_seconds, stats.p95)
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Per-backend p50 / p95 time to first token and error rate."""
+        with self._lock:
+            return {
+                b: {"p50": s.p50, "p95": s.p95, "error_rate": s.error_rate}
+                for b, s in self.stats.items()
+            }
@@ -0,0 +1,126 @@
+"""
+intents.py
+Declarative intent table, compiled once, for the Router.
+
+Responsibilities:
+- Describe each command by its trigger phrases and a priority
+- Compile all "starts with" triggers into one character trie, and all
+  "contains" triggers into one regex, so matching is a single pass over
+  the text however many intents there are
+- Resolve overlaps explicitly (priority, then longest trigger) instead of
+  by the order of if-statements
+- Count hits per intent
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_END = ""   # trie key marking the end of a trigger
+
+
+@dataclass(frozen=True)
+class Intent:
+    name: str
+    prefixes: Tuple[str, ...] = ()   # text starts with one of these
+    phrases: Tuple[str, ...] = ()    # text contains one of these
+    priority: int = 0                # higher wins when several intents match
+    requires_argument: bool = False  # prefix must be followed by something
+    # For the fuzzy classifier (classifier.py): example phrasings with "{}"
+    # where the argument goes, and the words the argument follows
+    examples: Tuple[str, ...] = ()
+    cues: Tuple[str, ...] = ()
+
+
+@dataclass
+class IntentMatch:
+    intent: Intent
+    trigger: str
+    argument: str = ""   # original-case text after a prefix trigger
+    score: float = 1.0   # classifier confidence; 1.0 for literal matches
+
+
+def _at_boundary(text: str, index: int) -> bool:
+    return index >= len(text) or not text[index].isalnum()
+
+
+class IntentMatcher:
+    def __init__(self, intents: Iterable[Intent]) -> None:
+        self.intents: List[Intent] = list(intents)
+        self.hits: Counter = Counter()
+        self._lock = threading.Lock()
+
+        self._trie: Dict = {}
+        phrase_owner: Dict[str, List[Intent]] = {}
+        for intent in self.intents:
+            for prefix in intent.prefixes:
+                node = self._trie
+                for ch in prefix.lower():
+                    node = node.setdefault(ch, {})
+                node.setdefault(_END, []).append(intent)
+            for phrase in intent.phrases:
+                phrase_owner.setdefault(phrase.lower(), []).append(intent)
+        self._phrase_owner = phrase_owner
+        self._check_ambiguous()
+
+        # Longest first so overlapping phrases prefer the more specific one
+        alternatives = sorted(phrase_owner, key=len, reverse=True)
+        self._phrase_re: Optional[re.Pattern] = None
+        if alternatives:
+            self._phrase_re = re.compile(
+                r"(?<!\w)(?:" + "|".join(re.escape(p) for p in alternatives) + r")(?!\w)"
+            )
+
+    def _check_ambiguous(self) -> None:
+        """The same trigger on two intents needs a priority to break the tie."""
+        seen: Dict[Tuple[str, str, int], str] = {}
+        for intent in self.intents:
+            for kind, triggers in (("prefix", intent.prefixes), ("phrase", intent.phrases)):
+                for trigger in triggers:
+                    key = (kind, trigger.lower(), intent.priority)
+                    if key in seen and seen[key] != intent.name:
+                        raise ValueError(
+                            f"Intents {seen[key]!r} and {intent.name!r} share the {kind} "
+                            f"{trigger!r} with the same priority."
+                        )
+                    seen[key] = intent.name
+
+    def candidates(self, text: str) -> List[IntentMatch]:
+        """Every intent whose trigger matches `text`."""
+        lower = text.lower()
+        found: List[IntentMatch] = []
+
+        node = self._trie
+        for i, ch in enumerate(lower):
+            node = node.get(ch)
+            if node is None:
+                break
+            if _END in node and _at_boundary(lower, i + 1):
+                argument = text[i + 1:].strip(" :,")
+                for intent in node[_END]:
+                    if argument or not intent.requires_argument:
+                        found.append(IntentMatch(intent, lower[:i + 1], argument))
+
+        if self._phrase_re is not None:
+            for m in self._phrase_re.finditer(lower):
+                for intent in self._phrase_owner[m.group(0)]:
+                    found.append(IntentMatch(intent, m.group(0)))
+        return found
+
+    def match(self, text: str) -> Optional[IntentMatch]:
+        """Best match: highest priority, then longest trigger."""
+        found = self.candidates(text.strip())
+        if not found:
+            return None
+        best = max(found, key=lambda m: (m.intent.priority, len(m.trigger)))
+        with self._lock:
+            self.hits[best.intent.name] += 1
+        return best
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {intent.name: self.hits[intent.name] for intent in self.intents}
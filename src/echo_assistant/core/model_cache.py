@@ -0,0 +1,193 @@
+"""
+model_cache.py
+Local cache manifest for openWakeWord model files.
+
+Responsibilities:
+- Remember where each wake-word / feature model lives on disk, with its
+  size and SHA-256, in a small JSON manifest
+- Resolve model names to paths at startup without touching the network
+- Download / re-hash models only when asked (maintenance command)
+
+Run maintenance with:
+    python -m echo_assistant.main download-models
+    python -m echo_assistant.main verify-models
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+MANIFEST_PATH = os.path.join(DATA_DIR, "model_manifest.json")
+
+# openWakeWord's shared front-end models, needed by every wake-word model
+FEATURE_MODELS = ("melspectrogram", "embedding")
+
+
+class ModelCacheError(RuntimeError):
+    """A required model is not in the local cache."""
+
+
+@dataclass
+class ModelEntry:
+    name: str
+    path: str
+    size: int
+    sha256: str
+
+
+def model_key(name: str) -> str:
+    """Normalise a model name: "hey jarvis" -> "hey_jarvis"."""
+    return name.strip().lower().replace(" ", "_")
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _find_on_disk(key: str, inference_framework: str) -> Optional[str]:
+    """
+    Locate an already-downloaded model inside the openwakeword package
+    (same name matching as openwakeword.Model), without any network access.
+    """
+    import openwakeword
+
+    if key in FEATURE_MODELS:
+        path = openwakeword.FEATURE_MODELS[key]["model_path"]
+        if inference_framework == "onnx":
+            path = path.replace(".tflite", ".onnx")
+        return path if os.path.exists(path) else None
+
+    for path in openwakeword.get_pretrained_model_paths(inference_framework):
+        if os.path.basename(path).startswith(key) and os.path.exists(path):
+            return path
+    return None
+
+
+class ModelCache:
+    def __init__(self, manifest_path: str = MANIFEST_PATH, inference_framework: str = "tflite") -> None:
+        self.manifest_path = manifest_path
+        self.inference_framework = inference_framework
+        self.entries: Dict[str, ModelEntry] = self._load()
+
+    # ---- Manifest I/O ----
+
+    def _load(self) -> Dict[str, ModelEntry]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[ModelCache] Ignoring unreadable manifest: {e}")
+            return {}
+        models = data.get("models", {}).get(self.inference_framework, {})
+        return {key: ModelEntry(**entry) for key, entry in models.items()}
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        data = {"version": 1, "models": {}}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                pass
+        data.setdefault("models", {})[self.inference_framework] = {
+            key: asdict(entry) for key, entry in self.entries.items()
+        }
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def _record(self, key: str, path: str) -> ModelEntry:
+        entry = ModelEntry(name=key, path=path, size=os.path.getsize(path), sha256=_sha256(path))
+        self.entries[key] = entry
+        return entry
+
+    # ---- Lookup ----
+
+    def resolve(self, names: Optional[List[str]]) -> Dict[str, str]:
+        """
+        Map model names (plus the feature models) to local paths.
+
+        Uses the manifest with a cheap size check; models that exist on disk
+        but are missing from the manifest are hashed and added once. Never
+        downloads: raises ModelCacheError if something is missing.
+        """
+        keys = [model_key(n) for n in names] if names else self._all_wakeword_keys()
+        resolved: Dict[str, str] = {}
+        missing: List[str] = []
+        changed = False
+
+        for key in list(FEATURE_MODELS) + keys:
+            entry = self.entries.get(key)
+            if entry and os.path.exists(entry.path) and os.path.getsize(entry.path) == entry.size:
+                resolved[key] = entry.path
+                continue
+            path = _find_on_disk(key, self.inference_framework)
+            if path is None:
+                missing.append(key)
+                continue
+            resolved[key] = self._record(key, path).path
+            changed = True
+
+        if changed:
+            self.save()
+        if missing:
+            raise ModelCacheError(
+                f"Wake-word models not cached: {', '.join(missing)}. "
+                "Run 'python -m echo_assistant.main download-models' once while online."
+            )
+        return resolved
+
+    def _all_wakeword_keys(self) -> List[str]:
+        keys = [k for k in self.entries if k not in FEATURE_MODELS]
+        if keys:
+            return keys
+        import openwakeword
+        return list(openwakeword.MODELS.keys())
+
+    # ---- Maintenance ----
+
+    def download(self, names: Optional[List[str]] = None) -> None:
+        """
+        Download models with openwakeword and (re)write the manifest.
+        """
+        import openwakeword
+
+        keys = [model_key(n) for n in names] if names else list(openwakeword.MODELS.keys())
+        print(f"[ModelCache] Downloading openWakeWord models: {keys}")
+        openwakeword.utils.download_models(model_names=keys)
+
+        for key in list(FEATURE_MODELS) + keys:
+            path = _find_on_disk(key, self.inference_framework)
+            if path is None:
+                print(f"[ModelCache] WARNING: {key} still missing after download.")
+                continue
+            entry = self._record(key, path)
+            print(f"[ModelCache] {key}: {entry.path} ({entry.size} bytes)")
+        self.save()
+        print(f"[ModelCache] Manifest written to {self.manifest_path}")
+
+    def verify(self) -> List[str]:
+        """
+        Re-hash every cached model. Returns a list of problems (empty if OK).
+        """
+        problems = []
+        for key, entry in sorted(self.entries.items()):
+            if not os.path.exists(entry.path):
+                problems.append(f"{key}: missing file {entry.path}")
+            elif _sha256(entry.path) != entry.sha256:
+                problems.append(f"{key}: checksum mismatch for {entry.path}")
+        return problems
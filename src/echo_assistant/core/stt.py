@@ -5,12 +5,14 @@ Speech-to-text interface for Echo Assistant.
 Responsibilities:
 - Wrap the chosen STT backend (initially: local Whisper via faster-whisper)
 - Provide a simple function: transcribe(audio: np.ndarray) -> str
+- Provide incremental transcription over a stream of audio chunks
 """
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 from faster_whisper import WhisperModel
@@ -22,6 +24,29 @@ class STTConfig:
     device: str = "cpu"          # "cpu" or "cuda"
     compute_type: str = "int8"   # "int8" / "int8_float32" / "float16" / "float32"
     language: str = "en"         # Forcing language speeds things up.
+    beam_size: int = 5
+    # Streaming: re-decode the window every `stream_step_seconds` of new audio,
+    # with a cheaper beam; the window is trimmed at committed words.
+    stream_step_seconds: float = 0.6
+    stream_beam_size: int = 1
+    stream_max_window_seconds: float = 15.0
+    # Streaming decodes skip Whisper's VAD, so drop segments the model itself
+    # thinks are silence (where it hallucinates "Thank you." and the like).
+    no_speech_threshold: float = 0.6
+
+
+@dataclass
+class Word:
+    start: float  # seconds from the start of the stream
+    end: float
+    text: str
+
+
+@dataclass
+class PartialTranscript:
+    text: str             # committed text so far (never revised)
+    is_final: bool = False
+    avg_logprob: float = float("nan")
 
 
 class STTEngine:
@@ -46,15 +71,12 @@ class STTEngine:
         segments, info = self.model.transcribe(
             audio,
             language=self.config.language,
-            beam_size=5,
+            beam_size=self.config.beam_size,
             vad_filter=True,  # helps ignore silence
         )
 
-        texts = []
-        for seg in segments:
-            texts.append(seg.text)
-
-        full_text = " ".join(t.strip() for t in texts).strip()
+        # segments is lazy: decoding happens as we iterate
+        full_text = " ".join(seg.text.strip() for seg in segments).strip()
 
         avg_logprob = getattr(info, "avg_logprob", float("nan"))
         print(f"[STT] Transcription: '{full_text}'")
@@ -62,6 +84,166 @@ class STTEngine:
 
         return full_text, avg_logprob
 
+    def warmup(self) -> None:
+        """
+        Run one throwaway decode so the first real request doesn't pay for
+        lazy initialisation inside CTranslate2.
+        """
+        silence = np.zeros(16_000, dtype=np.float32)
+        segments, _info = self.model.transcribe(silence, language=self.config.language, beam_size=1)
+        for _ in segments:
+            pass
+
+    def decode_words(
+        self,
+        audio: np.ndarray,
+        offset: float = 0.0,
+        prompt: Optional[str] = None,
+        beam_size: Optional[int] = None,
+    ) -> Tuple[List[Word], float]:
+        """
+        Decode `audio` into word-level hypotheses with timestamps shifted by
+        `offset` seconds. Returns (words, mean segment avg_logprob).
+
+        Segments with no_speech_prob above `no_speech_threshold` are dropped.
+        """
+        segments, _info = self.model.transcribe(
+            audio,
+            language=self.config.language,
+            beam_size=beam_size or self.config.beam_size,
+            initial_prompt=prompt or None,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            vad_filter=False,  # the window is already speech; keep its edges
+        )
+
+        words: List[Word] = []
+        logprobs: List[float] = []
+        for seg in segments:
+            if seg.no_speech_prob > self.config.no_speech_threshold:
+                continue
+            logprobs.append(seg.avg_logprob)
+            for w in seg.words or []:
+                words.append(Word(start=w.start + offset, end=w.end + offset, text=w.word))
+
+        avg_logprob = float(np.mean(logprobs)) if logprobs else float("nan")
+        return words, avg_logprob
+
+    def transcribe_stream(self, chunks: Iterable[np.ndarray]) -> Iterator[PartialTranscript]:
+        """
+        Incrementally transcribe audio as it arrives.
+
+        Yields a PartialTranscript each time more text becomes stable, and a
+        final one (is_final=True) once `chunks` is exhausted.
+        """
+        stream = StreamingTranscriber(self)
+        for chunk in chunks:
+            if stream.feed(chunk):
+                yield PartialTranscript(text=stream.committed_text)
+        text, avg_logprob = stream.finish()
+        yield PartialTranscript(text=text, is_final=True, avg_logprob=avg_logprob)
+
+
+def _norm_word(text: str) -> str:
+    return re.sub(r"[^\w']", "", text.lower())
+
+
+class StreamingTranscriber:
+    """
+    LocalAgreement-2 streaming on top of a batch Whisper model.
+
+    Every `stream_step_seconds` of new audio the uncommitted window is
+    re-decoded. Words on which two consecutive hypotheses agree are committed
+    and never revised; the audio before the last committed word is dropped
+    from the window, so each decode (and the final one) stays short.
+    """
+
+    def __init__(self, engine: STTEngine, sample_rate: int = 16_000) -> None:
+        self.engine = engine
+        self.config = engine.config
+        self.sample_rate = sample_rate
+
+        self._chunks: List[np.ndarray] = []
+        self._window = np.zeros(0, dtype=np.float32)
+        self._window_offset = 0.0   # stream time of window[0], seconds
+        self._pending = 0           # samples fed since the last decode
+
+        self.committed: List[Word] = []
+        self._previous: List[Word] = []
+        self._logprob = float("nan")
+
+    @property
+    def committed_text(self) -> str:
+        return "".join(w.text for w in self.committed).strip()
+
+    @property
+    def _committed_end(self) -> float:
+        return self.committed[-1].end if self.committed else 0.0
+
+    def feed(self, chunk: np.ndarray) -> bool:
+        """
+        Add audio. Returns True if new words were committed.
+        """
+        self._chunks.append(np.asarray(chunk, dtype=np.float32).copy())
+        self._pending += len(chunk)
+        if self._pending < self.config.stream_step_seconds * self.sample_rate:
+            return False
+        return self._step(final=False)
+
+    def finish(self) -> Tuple[str, float]:
+        """
+        Decode whatever is left and commit it. Returns (text, avg_logprob).
+        """
+        self._step(final=True)
+        text = self.committed_text
+        print(f"[STT] Transcription: '{text}'")
+        return text, self._logprob
+
+    def _step(self, final: bool) -> bool:
+        if self._chunks:
+            self._window = np.concatenate([self._window] + self._chunks)
+            self._chunks = []
+        self._pending = 0
+        if len(self._window) == 0:
+            return False
+
+        beam = self.config.beam_size if final else self.config.stream_beam_size
+        words, self._logprob = self.engine.decode_words(
+            self._window,
+            offset=self._window_offset,
+            prompt=self.committed_text[-200:],
+            beam_size=beam,
+        )
+        # Anything that ends before the committed boundary was already emitted
+        words = [w for w in words if w.end > self._committed_end + 0.01]
+
+        if final:
+            new = words
+        else:
+            new = []
+            for prev, cur in zip(self._previous, words):
+                if _norm_word(prev.text) != _norm_word(cur.text):
+                    break
+                new.append(cur)
+            self._previous = words[len(new):]
+
+        self.committed.extend(new)
+        self._trim_window()
+        return bool(new)
+
+    def _trim_window(self) -> None:
+        """Drop audio up to the last committed word, or the oldest audio if too long."""
+        cut_time = self._committed_end
+        max_len = self.config.stream_max_window_seconds
+        window_end = self._window_offset + len(self._window) / self.sample_rate
+        cut_time = max(cut_time, window_end - max_len)
+
+        cut = int((cut_time - self._window_offset) * self.sample_rate)
+        if cut <= 0:
+            return
+        self._window = self._window[cut:]
+        self._window_offset += cut / self.sample_rate
+
 
 def _demo_record_and_transcribe():
     """
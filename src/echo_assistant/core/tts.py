@@ -3,46 +3,456 @@ tts.py
 Text-to-speech interface for Echo Assistant.
 
 Responsibilities:
-- Wrap the chosen TTS backend (initially: pyttsx3)
+- Wrap the chosen TTS backend (pyttsx3 or Piper, see tts_backends.py)
 - Provide a simple function: speak(text: str) -> None
+- Split streamed LLM output into sentences so speech can start early
+- Render short, repeated phrases to PCM once and replay them from a cache
+- Play audio on a dedicated thread that can be stopped mid-sentence (barge-in)
+
+Synthesis (text -> Clips of PCM samples) and playback are separate steps on
+their own threads: a reply starts playing as soon as its first chunk is
+rendered, and the next sentence renders while this one plays. The backend is
+created on, and only ever used from, the synthesis thread (pyttsx3 drivers
+such as SAPI5 are bound to the thread that created them). Canned replies
+("I didn't catch that.", "Goodbye.") are rendered at startup, kept in an LRU
+and persisted as WAV files under data/tts_cache: later they play without
+touching the synthesizer at all.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import hashlib
+import os
+import queue
+import re
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import sounddevice as sd
+
+from .tts_backends import Clip, join_clips, make_backend, read_wav, write_wav
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "tts_cache")
 
-import pyttsx3
+# Fixed replies worth rendering before they're first needed
+COMMON_PHRASES = (
+    "I didn't catch that.",
+    "I didn't catch that. Please try again.",
+    "Goodbye.",
+    "Shutting down.",
+    "Shutting down wake-word mode. Goodbye.",
+    "Note saved.",
+    "Okay, I'll remember that.",
+)
 
 
 @dataclass
 class TTSConfig:
-    voice_name: Optional[str] = None   # e.g. "Microsoft Zira Desktop" (optional)
+    backend: str = "pyttsx3"           # "pyttsx3" or "piper"
+    voice_name: Optional[str] = None   # pyttsx3: e.g. "Microsoft Zira Desktop"; piper: .onnx voice
     rate: int = 180                    # words per minute
     volume: float = 1.0                # 0.0 to 1.0
 
+    # Rendered-phrase cache
+    cache_enabled: bool = True
+    cache_dir: Optional[str] = CACHE_DIR   # None = memory only
+    cache_max_entries: int = 64            # clips kept in memory
+    cache_max_files: int = 256             # clips kept on disk
+    cache_max_chars: int = 160             # longer text is always synthesized fresh
+
+
+@dataclass
+class _Utterance:
+    text: str
+    cache: bool
+    generation: int
+    chunks: "queue.Queue[Optional[Clip]]" = field(default_factory=queue.Queue)  # None ends
+    direct: bool = False          # backend couldn't render: speak `text` directly
+    dropped: bool = False         # flushed before it played
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class ClipCache:
+    """
+    LRU of rendered clips, optionally persisted as one WAV file per key in
+    `directory` (oldest files are pruned past `max_files`).
+    """
+
+    def __init__(self, max_entries: int = 64, directory: Optional[str] = None, max_files: int = 256) -> None:
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_files = max_files
+        self._clips: "OrderedDict[str, Clip]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".wav")
+
+    def get(self, key: str) -> Optional[Clip]:
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is not None:
+                self._clips.move_to_end(key)
+                self.hits += 1
+                return clip
+
+        path = self._path(key)
+        if path and os.path.exists(path):
+            try:
+                clip = read_wav(path)
+                os.utime(path)   # keep recently used files from being pruned
+            except (OSError, EOFError, wave.Error):
+                clip = None
+            if clip is not None:
+                self._remember(key, clip)
+                with self._lock:
+                    self.hits += 1
+                return clip
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, clip: Clip) -> None:
+        self._remember(key, clip)
+        path = self._path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = path + ".tmp"
+            write_wav(tmp, clip)
+            os.replace(tmp, path)
+            self._prune()
+        except OSError as e:
+            print(f"[TTS] Could not persist rendered phrase: {e}")
+
+    def _remember(self, key: str, clip: Clip) -> None:
+        with self._lock:
+            self._clips[key] = clip
+            self._clips.move_to_end(key)
+            while len(self._clips) > self.max_entries:
+                self._clips.popitem(last=False)
+
+    def _prune(self) -> None:
+        files = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".wav")
+        ]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=os.path.getmtime)
+        for path in files[: len(files) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a line break. "3.5" and "example.com" don't match.
+_SENTENCE_END = re.compile(r"""[.!?…]+["')\]]*\s+|\n+""")
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "no."}
+
+
+def iter_sentences(pieces: Iterable[str], min_chars: int = 20) -> Iterator[str]:
+    """
+    Re-chunk a stream of text pieces (LLM tokens) into sentences.
+
+    Each sentence is yielded as soon as its terminator arrives. Very short
+    sentences ("Sure.") are merged with the next one so TTS isn't called for
+    a single word.
+    """
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        start = 0
+        for match in _SENTENCE_END.finditer(buffer):
+            end = match.end()
+            candidate = buffer[start:end].strip()
+            words = candidate.split()
+            if words and words[-1].lower() in _ABBREVIATIONS:
+                continue
+            if len(candidate) < min_chars:
+                continue
+            yield candidate
+            start = end
+        buffer = buffer[start:]
+
+    tail = buffer.strip()
+    if tail:
+        yield tail
+
 
 class TTSEngine:
     def __init__(self, config: Optional[TTSConfig] = None) -> None:
         self.config = config or TTSConfig()
-        self.engine = pyttsx3.init()
+        self.backend = None   # created on the synthesis thread, see _synth_loop()
 
-        # Apply basic settings
-        self.engine.setProperty("rate", self.config.rate)
-        self.engine.setProperty("volume", self.config.volume)
+        self.cache: Optional[ClipCache] = None
+        if self.config.cache_enabled:
+            self.cache = ClipCache(
+                max_entries=self.config.cache_max_entries,
+                directory=self.config.cache_dir,
+                max_files=self.config.cache_max_files,
+            )
 
-        if self.config.voice_name:
-            for v in self.engine.getProperty("voices"):
-                if self.config.voice_name.lower() in v.name.lower():
-                    self.engine.setProperty("voice", v.id)
-                    break
+        # say_async() queues an utterance for both threads: the synthesis
+        # thread fills its chunk queue while the playback thread drains it, so
+        # audio starts with the first chunk and the next sentence renders
+        # while this one plays. Every backend call runs as a task on the
+        # synthesis thread.
+        self._synth_q: "queue.Queue[Callable[[], None]]" = queue.Queue()
+        self._play_q: "queue.Queue[_Utterance]" = queue.Queue()
+        self._generation = 0      # bumped by stop(); older utterances are dropped
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._direct = False      # backend is speaking directly (no rendered clip)
+        self._backend_ready = threading.Event()
+        self._backend_error: Optional[BaseException] = None
+        self._out: Optional[sd.OutputStream] = None
+        self._out_format = None
+        self.speaking = threading.Event()
+        self._synth_thread = threading.Thread(target=self._synth_loop, name="echo-tts-synth", daemon=True)
+        self._synth_thread.start()
+        self._backend_ready.wait()
+        if self._backend_error is not None:
+            raise self._backend_error
+        threading.Thread(target=self._playback_loop, name="echo-tts", daemon=True).start()
 
-    def speak(self, text: str) -> None:
-        if not text:
+    def warmup(self) -> None:
+        """
+        Drive the synthesizer once without playing anything, so voices are
+        loaded before the first real reply, and pre-render common phrases.
+        """
+        if self.cache is not None:
+            self.prewarm(COMMON_PHRASES)
+        else:
+            self.synthesize("ready")
+
+    def prewarm(self, phrases: Sequence[str]) -> None:
+        """Render `phrases` into the cache (disk hits cost only a file read)."""
+        rendered = sum(1 for p in phrases if self.render(p) is not None)
+        print(f"[TTS] {rendered}/{len(phrases)} common phrases ready")
+
+    # ---- Synthesis thread ----
+
+    def _synth_loop(self) -> None:
+        try:
+            self.backend = make_backend(self.config)
+        except BaseException as e:
+            self._backend_error = e
             return
+        finally:
+            self._backend_ready.set()
+        while True:
+            task = self._synth_q.get()
+            task()
+
+    def _on_synth(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) on the synthesis thread and return its result."""
+        if threading.current_thread() is self._synth_thread:
+            return fn(*args)
+        future: Future = Future()
+
+        def task() -> None:
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        self._synth_q.put(task)
+        return future.result()
+
+    # ---- Synthesis ----
+
+    def _cache_key(self, text: str) -> Optional[str]:
+        text = text.strip()
+        if self.cache is None or not text or len(text) > self.config.cache_max_chars:
+            return None
+        return f"{self.backend.voice_id()}|{self.config.rate}|{self.config.volume}|{text}"
+
+    def _chunks(self, text: str) -> Iterator[Clip]:
+        """Rendered audio for `text`, one sentence (or backend chunk) at a time."""
+        for sentence in iter_sentences([text]):
+            yield from self.backend.stream(sentence)
+
+    def synthesize(self, text: str) -> Optional[Clip]:
+        """Render `text` to PCM without playing it; None if the backend can't."""
+        return self._on_synth(self._synthesize, text)
+
+    def _synthesize(self, text: str) -> Optional[Clip]:
+        clips = list(self._chunks(text))
+        return join_clips(clips) if clips else None
+
+    def render(self, text: str) -> Optional[Clip]:
+        """Cached clip for `text`, rendering it on a miss; None if uncacheable."""
+        return self._on_synth(self._render, text)
+
+    def _render(self, text: str) -> Optional[Clip]:
+        key = self._cache_key(text)
+        if key is None:
+            return None
+        clip = self.cache.get(key)
+        if clip is None:
+            clip = self._synthesize(text.strip())
+            if clip is not None:
+                self.cache.put(key, clip)
+        return clip
+
+    def _live(self, utterance: _Utterance) -> bool:
+        return not utterance.dropped and utterance.generation == self._generation
+
+    def _render_utterance(self, utterance: _Utterance) -> None:
+        try:
+            if self._live(utterance):
+                self._render_into(utterance)
+        except Exception as e:
+            print(f"[TTS] Synthesis failed: {e}")
+        finally:
+            utterance.chunks.put(None)
+
+    def _say_direct(self, utterance: _Utterance) -> None:
+        if not self._live(utterance):
+            return
+        self._direct = True
+        try:
+            self.backend.say(utterance.text)
+        finally:
+            self._direct = False
+
+    def _render_into(self, utterance: _Utterance) -> None:
+        key = self._cache_key(utterance.text) if utterance.cache else None
+        if key is not None:
+            clip = self.cache.get(key)
+            if clip is not None:
+                utterance.chunks.put(clip)
+                return
+
+        rendered: List[Clip] = []
+        for clip in self._chunks(utterance.text):
+            if not self._live(utterance):
+                return
+            utterance.chunks.put(clip)
+            rendered.append(clip)
+
+        if not rendered:
+            utterance.direct = not self.backend.can_render
+        elif key is not None:
+            self.cache.put(key, join_clips(rendered))
+
+    # ---- Playback ----
+
+    def say_async(self, text: str, cache: bool = True) -> Optional[threading.Event]:
+        """
+        Queue `text` behind whatever is playing and return at once. Returns
+        an Event set once it has played or been stopped.
+        """
+        if not text:
+            return None
         print(f"[TTS] Speaking: {text}")
-        self.engine.say(text)
-        self.engine.runAndWait()
+        with self._idle:
+            utterance = _Utterance(text=text, cache=cache, generation=self._generation)
+            self._pending += 1
+        self._synth_q.put(lambda: self._render_utterance(utterance))
+        self._play_q.put(utterance)
+        return utterance.done
+
+    def speak(self, text: str, cache: bool = True) -> None:
+        """
+        Speak `text` and wait until it has played (or stop() cut it off).
+        Short phrases go through the clip cache; pass cache=False for one-off
+        text (e.g. sentences of a streamed reply).
+        """
+        done = self.say_async(text, cache=cache)
+        if done is not None:
+            done.wait()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued has played. False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def flush(self) -> None:
+        """Drop queued utterances; the one playing now finishes."""
+        while True:
+            try:
+                utterance = self._play_q.get_nowait()
+            except queue.Empty:
+                return
+            utterance.dropped = True
+            self._finished(utterance)
+
+    def stop(self) -> None:
+        """Cut off the current utterance within one block and drop the queue."""
+        with self._idle:
+            self._generation += 1
+        self.flush()
+        if self._direct:
+            # backend.stop() only flags the request; the synthesis thread acts on it
+            self.backend.stop()
+
+    def _finished(self, utterance: _Utterance) -> None:
+        utterance.done.set()
+        with self._idle:
+            self._pending -= 1
+            self._idle.notify_all()
+
+    def _playback_loop(self) -> None:
+        while True:
+            utterance = self._play_q.get()
+            try:
+                while self._live(utterance):
+                    clip = utterance.chunks.get()
+                    if clip is None:
+                        break
+                    self.speaking.set()
+                    self._play(clip, utterance.generation)
+                if utterance.direct and self._live(utterance):
+                    self.speaking.set()
+                    self._on_synth(self._say_direct, utterance)
+            except Exception as e:
+                print(f"[TTS] Playback failed: {e}")
+            finally:
+                if self._play_q.empty():
+                    self.speaking.clear()
+                self._finished(utterance)
+
+    def _output(self, clip: Clip, dtype: np.dtype) -> sd.OutputStream:
+        """Output stream for `clip`'s format, kept open between clips."""
+        fmt = (clip.sample_rate, clip.channels, dtype.name)
+        if self._out is None or self._out_format != fmt:
+            if self._out is not None:
+                self._out.close()
+            self._out = sd.OutputStream(
+                samplerate=clip.sample_rate, channels=clip.channels, dtype=dtype.name
+            )
+            self._out_format = fmt
+        if not self._out.active:
+            self._out.start()
+        return self._out
+
+    def _play(self, clip: Clip, generation: int) -> None:
+        samples = clip.samples()
+        out = self._output(clip, samples.dtype)
+        block = max(1, clip.sample_rate // 20)   # 50 ms: how quickly stop() takes effect
+        for start in range(0, len(samples), block):
+            if generation != self._generation:
+                out.abort()   # drop audio already handed to the device
+                return
+            out.write(samples[start:start + block])
 
 
 def _demo_speak():
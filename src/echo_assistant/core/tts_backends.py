@@ -0,0 +1,214 @@
+"""
+tts_backends.py
+Speech synthesis backends for Echo's TTS engine.
+
+A backend turns text into PCM Clips; tts.TTSEngine handles caching, queuing
+and playback. Available backends (Config.tts_backend / TTS_BACKEND):
+- "pyttsx3": the OS speech driver (SAPI5, NSSpeech, eSpeak); always available
+- "piper":   local neural voices (piper-tts, ONNX on the CPU); TTS_VOICE is a
+             .onnx voice file or the name of one in data/piper/
+
+Each backend reads the shared TTSConfig voice / rate / volume fields.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import wave
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .tts import TTSConfig
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PIPER_DIR = os.path.join(BASE_DIR, "data", "piper")
+
+# Words per minute Piper voices speak at with length_scale=1.0 (roughly)
+PIPER_BASE_RATE = 170
+
+
+@dataclass
+class Clip:
+    """Synthesized speech: interleaved little-endian PCM plus its format."""
+    pcm: bytes
+    sample_rate: int
+    channels: int = 1
+    sample_width: int = 2   # bytes per sample
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / float(self.sample_rate * self.channels * self.sample_width)
+
+    def samples(self) -> np.ndarray:
+        """(frames, channels) array ready for sounddevice."""
+        dtype = {1: np.uint8, 2: "<i2", 4: "<i4"}[self.sample_width]
+        return np.frombuffer(self.pcm, dtype=dtype).reshape(-1, self.channels)
+
+
+def join_clips(clips: List[Clip]) -> Clip:
+    """One clip from consecutive chunks of the same format."""
+    first = clips[0]
+    return Clip(
+        pcm=b"".join(c.pcm for c in clips),
+        sample_rate=first.sample_rate,
+        channels=first.channels,
+        sample_width=first.sample_width,
+    )
+
+
+def read_wav(path: str) -> Clip:
+    with wave.open(path, "rb") as w:
+        return Clip(
+            pcm=w.readframes(w.getnframes()),
+            sample_rate=w.getframerate(),
+            channels=w.getnchannels(),
+            sample_width=w.getsampwidth(),
+        )
+
+
+def write_wav(path: str, clip: Clip) -> None:
+    with wave.open(path, "wb") as w:
+        w.setnchannels(clip.channels)
+        w.setsampwidth(clip.sample_width)
+        w.setframerate(clip.sample_rate)
+        w.writeframes(clip.pcm)
+
+
+class Pyttsx3Backend:
+    """
+    OS speech driver via pyttsx3, rendered to a temporary WAV per chunk.
+
+    Drivers are bound to the thread that created them (SAPI5 needs COM set
+    up there), so create and use the backend on one thread; only stop() may
+    be called from elsewhere.
+    """
+
+    name = "pyttsx3"
+
+    def __init__(self, config: "TTSConfig") -> None:
+        import pyttsx3
+
+        self.engine = pyttsx3.init()
+        self.engine.setProperty("rate", config.rate)
+        self.engine.setProperty("volume", config.volume)
+
+        if config.voice_name:
+            for v in self.engine.getProperty("voices"):
+                if config.voice_name.lower() in v.name.lower():
+                    self.engine.setProperty("voice", v.id)
+                    break
+
+        self.can_render = True   # cleared if the driver can't write WAV files
+        # stop() sets this; the driver checks it between words on its own thread
+        self._interrupt = threading.Event()
+        self.engine.connect("started-word", self._on_word)
+
+    def voice_id(self) -> str:
+        return f"pyttsx3:{self.engine.getProperty('voice')}"
+
+    def stream(self, text: str) -> Iterator[Clip]:
+        if not self.can_render:
+            return
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            clip = read_wav(path)
+        except (OSError, EOFError, wave.Error) as e:
+            print(f"[TTS] Driver can't render to WAV ({e}); speaking directly")
+            self.can_render = False
+            return
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        yield clip
+
+    def _on_word(self, name, location, length) -> None:
+        if self._interrupt.is_set():
+            self.engine.stop()
+
+    def say(self, text: str) -> None:
+        """Speak through the driver directly (when rendering isn't possible)."""
+        self._interrupt.clear()
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def stop(self) -> None:
+        """Ask a direct say() to end at the next word; safe from any thread."""
+        self._interrupt.set()
+
+
+class PiperBackend:
+    """Piper neural voice; yields audio sentence by sentence as it is produced."""
+
+    name = "piper"
+    can_render = True
+
+    def __init__(self, config: "TTSConfig") -> None:
+        from piper import PiperVoice
+
+        self.model_path = _piper_model_path(config.voice_name)
+        self.voice = PiperVoice.load(self.model_path)
+        self.sample_rate = int(self.voice.config.sample_rate)
+        self.length_scale = PIPER_BASE_RATE / max(config.rate, 1)
+        self.volume = config.volume
+
+    def voice_id(self) -> str:
+        return f"piper:{os.path.basename(self.model_path)}"
+
+    def stream(self, text: str) -> Iterator[Clip]:
+        for pcm in self._raw(text):
+            if self.volume != 1.0:
+                samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) * self.volume
+                pcm = np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+            yield Clip(pcm=pcm, sample_rate=self.sample_rate)
+
+    def _raw(self, text: str) -> Iterator[bytes]:
+        if hasattr(self.voice, "synthesize_stream_raw"):   # piper-tts < 1.3
+            yield from self.voice.synthesize_stream_raw(text, length_scale=self.length_scale)
+            return
+        from piper import SynthesisConfig
+
+        syn_config = SynthesisConfig(length_scale=self.length_scale)
+        for chunk in self.voice.synthesize(text, syn_config=syn_config):
+            yield chunk.audio_int16_bytes
+
+    def say(self, text: str) -> None:
+        raise RuntimeError("Piper always renders; nothing to speak directly")
+
+    def stop(self) -> None:
+        pass
+
+
+def _piper_model_path(voice_name) -> str:
+    if not voice_name:
+        raise FileNotFoundError("set TTS_VOICE to a Piper .onnx voice")
+    candidates = [voice_name, os.path.join(PIPER_DIR, voice_name)]
+    candidates += [c + ".onnx" for c in candidates if not c.endswith(".onnx")]
+    for path in candidates:
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f"Piper voice {voice_name!r} not found (looked in {PIPER_DIR})")
+
+
+def make_backend(config: "TTSConfig"):
+    """The configured backend, falling back to pyttsx3 if it can't load."""
+    name = (config.backend or "pyttsx3").lower()
+    if name == "piper":
+        try:
+            backend = PiperBackend(config)
+            print(f"[TTS] Using Piper voice {backend.voice_id()}")
+            return backend
+        except (ImportError, OSError) as e:
+            print(f"[TTS] Piper unavailable ({e}); falling back to pyttsx3")
+    elif name != "pyttsx3":
+        print(f"[TTS] Unknown backend {name!r}; using pyttsx3")
+    return Pyttsx3Backend(config)
@@ -3,18 +3,32 @@ wakeword.py
 openWakeWord-based wake-word detection for Echo.
 
 Uses pre-trained models like "hey jarvis", "alexa", etc.
+
+Threads: the audio callback (capture) only converts each block and drops it
+into a bounded frame queue; run() is the inference worker draining it; a
+detection callback runs on its own executor so a slow handler never stalls
+inference. If inference falls behind, the oldest frames are dropped and
+counted (see stats()).
 """
 
 from __future__ import annotations
 
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
-import sounddevice as sd
-import openwakeword
 from openwakeword.model import Model
 
+from .audio import AudioConfig, MicrophoneStream
+from .model_cache import FEATURE_MODELS, ModelCache, model_key
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class WakeWordConfig:
@@ -23,86 +37,250 @@ class WakeWordConfig:
     model_names: Optional[List[str]] = None
     threshold: float = 0.5  # score threshold for activation (0–1)
     smoothing_window: int = 5  # number of frames to average for smoothing
+    peak_frames: int = 3  # a single frame above threshold * peak_factor in this many also triggers
+    peak_factor: float = 2.5
+    pre_roll_seconds: float = 0.5  # audio before detection handed to the command recorder
+    inference_framework: str = "tflite"  # "tflite" or "onnx"
+    frame_queue_size: int = 25  # frames (80 ms each) buffered ahead of inference; oldest dropped past this
+    playback_threshold_scale: float = 1.5  # stricter while Echo speaks (its voice reaches the mic)
+
+
+class ScoreSmoother:
+    """
+    Rolling mean and recent peak of the wake-word scores of every model at
+    once. Scores live in a preallocated (models x window) ring and the mean
+    comes from running sums, so a frame costs O(models) with no allocation.
+    """
+
+    def __init__(self, names: Sequence[str], window: int, peak_frames: int = 3) -> None:
+        self.names = list(names)
+        self.window = max(1, window)
+        self.peak_frames = max(1, min(peak_frames, self.window))
+        n = len(self.names)
+        self._ring = np.zeros((n, self.window), dtype=np.float32)
+        self._sums = np.zeros(n, dtype=np.float64)
+        self._counts = np.zeros(n, dtype=np.int64)   # frames seen since reset, capped at window
+        self._pos = 0
+        self.smoothed = np.zeros(n, dtype=np.float64)
+        self.peaks = np.zeros(n, dtype=np.float32)
+        self._recent = np.zeros((n, self.peak_frames), dtype=np.float32)
+        # Ring columns of the last `peak_frames` frames, for each write position
+        self._peak_cols = [
+            (pos - 1 - np.arange(self.peak_frames)) % self.window for pos in range(self.window)
+        ]
+
+    def update(self, scores: np.ndarray) -> None:
+        """Add one frame of scores (one per model, in `names` order)."""
+        column = self._ring[:, self._pos]
+        self._sums -= column
+        self._sums += scores
+        column[:] = scores
+        self._pos = (self._pos + 1) % self.window
+        self._counts += self._counts < self.window
+        np.divide(self._sums, self._counts, out=self.smoothed)
+        # Slots not written since a reset hold 0, which never wins the max.
+        self._ring.take(self._peak_cols[self._pos], axis=1, out=self._recent, mode="clip")
+        self._recent.max(axis=1, out=self.peaks)
+
+    def triggered(self, threshold: float, peak_factor: float) -> np.ndarray:
+        """Models whose mean passed `threshold` or whose recent peak passed threshold * peak_factor."""
+        return (self.smoothed >= threshold) | (self.peaks >= threshold * peak_factor)
+
+    def reset(self, index: Optional[int] = None) -> None:
+        """Forget the history of one model (or all of them)."""
+        rows = slice(None) if index is None else index
+        self._ring[rows] = 0.0
+        self._sums[rows] = 0.0
+        self._counts[rows] = 0
+        self.smoothed[rows] = 0.0
+        self.peaks[rows] = 0.0
 
 
 class WakeWordDetector:
-    def __init__(self, config: WakeWordConfig) -> None:
+    def __init__(self, config: WakeWordConfig, source: Optional[MicrophoneStream] = None) -> None:
         # Store the original model names that user provided
         # These will be simple names like "hey jarvis"
-        # CRITICAL: Save this BEFORE creating Model(), and pass a COPY to Model()
-        # because Model() modifies the list in-place to full file paths
         self.target_model_names = config.model_names.copy() if config.model_names else None
         self.config = config
 
-        # One-time download of pre-trained models (no account needed)
-        openwakeword.utils.download_models()
+        # Resolve model files from the local cache manifest; no network here.
+        # Downloading is a separate maintenance step (main.py download-models).
+        cache = ModelCache(inference_framework=config.inference_framework)
+        paths = cache.resolve(self.target_model_names)
+        wakeword_paths = [p for key, p in paths.items() if key not in FEATURE_MODELS]
 
-        # Load specified models, or all if None
-        # Pass a COPY so Model() doesn't modify our target_model_names
-        models_to_load = self.target_model_names.copy() if self.target_model_names else None
         self.model = Model(
-            wakeword_models=models_to_load,
+            wakeword_models=wakeword_paths,
+            inference_framework=config.inference_framework,
+            melspec_model_path=paths["melspectrogram"],
+            embedding_model_path=paths["embedding"],
+        )
+
+        # Prediction keys are file stems ("hey_jarvis_v0.1"); map them back to
+        # the configured names so target matching works.
+        self.key_to_name = {}
+        for key, path in paths.items():
+            stem = os.path.splitext(os.path.basename(path))[0]
+            self.key_to_name[stem] = key
+        self._target_keys = (
+            {model_key(n) for n in self.target_model_names} if self.target_model_names else None
         )
 
         self.sample_rate = 16_000
         self.frame_length = int(self.sample_rate * 0.08)
-        
-        # Score smoothing: keep a rolling window of scores per model
-        # The prediction dict uses model names like "hey jarvis", not file paths
-        self.score_history = {}
+
+        # Shared microphone: pass (or later assign) the recorder's stream so
+        # the command recorder and the detector read from the same device.
+        # If none is set by the time run() starts, the detector opens its own.
+        self.source = source
+        self._frames: "queue.Queue[Tuple[int, np.ndarray]]" = queue.Queue(
+            maxsize=max(1, config.frame_queue_size)
+        )
+        self._callbacks: Optional[ThreadPoolExecutor] = None
+        self._callback_future: Optional[Future] = None
+        # Counters (see stats())
+        self.frames_processed = 0
+        self.dropped_frames = 0
+        self.max_queue_depth = 0
+        self.skipped_callbacks = 0
+        # Ring-buffer position of the frame that fired the last detection
+        self.last_detection_frame: Optional[int] = None
+        self._stop = threading.Event()
+        # Set to e.g. tts_engine.speaking.is_set so the detector keeps running
+        # during playback (barge-in) without firing on the assistant's voice.
+        self.is_playing: Callable[[], bool] = lambda: False
+
+        # Score smoothing across all models; built on the first prediction,
+        # when the model's output names are known.
+        self.smoother: Optional[ScoreSmoother] = None
+        self._scores: Optional[np.ndarray] = None
+        self._target_mask: Optional[np.ndarray] = None
 
         print(
             f"[WakeWord] Using openWakeWord models: "
             f"{self.target_model_names or 'ALL'}; threshold={self.config.threshold}"
         )
-    
-    def _smooth_score(self, name: str, score: float) -> float:
+
+    def _ensure_smoother(self, names: Sequence[str]) -> ScoreSmoother:
+        if self.smoother is None or self.smoother.names != names:
+            self.smoother = ScoreSmoother(
+                names, self.config.smoothing_window, self.config.peak_frames
+            )
+            self._scores = np.zeros(len(names), dtype=np.float32)
+            # If specific models are configured, only those may trigger
+            self._target_mask = np.array([
+                self._target_keys is None
+                or self.key_to_name.get(name, model_key(name)) in self._target_keys
+                for name in names
+            ])
+        return self.smoother
+
+    def _detect(self, preds: Dict[str, float]) -> Optional[Tuple[str, float]]:
         """
-        Apply rolling average smoothing to stabilize detection.
+        Feed one frame of predictions to the smoother. Returns (name, smoothed
+        score) of the first target model that should trigger, else None.
         """
-        if name not in self.score_history:
-            self.score_history[name] = []
-        
-        self.score_history[name].append(float(score))
-        
-        if len(self.score_history[name]) > self.config.smoothing_window:
-            self.score_history[name].pop(0)
-        
-        # Return average of the window
-        avg_score = np.mean(self.score_history[name])
-        
-        # Also return max of recent frames (for peak detection)
-        return avg_score
-    
-    def _should_trigger(self, name: str, smoothed_score: float) -> bool:
+        smoother = self._ensure_smoother(list(preds))
+        for i, score in enumerate(preds.values()):
+            self._scores[i] = score
+        smoother.update(self._scores)
+
+        threshold = self.config.threshold
+        if self.is_playing():
+            threshold *= self.config.playback_threshold_scale
+        fired = smoother.triggered(threshold, self.config.peak_factor)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for i in np.flatnonzero(smoother.peaks > 0.05):   # only when there's a signal
+                logger.debug(
+                    "%s: smoothed=%.4f max_recent=%.4f threshold=%.3f trigger=%s target=%s",
+                    smoother.names[i], smoother.smoothed[i], smoother.peaks[i],
+                    threshold, fired[i], self._target_mask[i],
+                )
+
+        hits = np.flatnonzero(fired & self._target_mask)
+        if not len(hits):
+            return None
+        i = int(hits[0])
+        return smoother.names[i], float(smoother.smoothed[i])
+
+    def stop(self) -> None:
+        """Ask run() to return after the current frame."""
+        self._stop.set()
+
+    def warmup(self) -> None:
+        """Push a few silent frames through the models, then reset their state."""
+        silence = np.zeros(self.frame_length, dtype=np.int16)
+        for _ in range(3):
+            self.model.predict(silence)
+        self.model.reset()
+        if self.smoother is not None:
+            self.smoother.reset()
+
+    def utterance_start(self) -> Optional[int]:
         """
-        Determine if we should trigger detection.
-        Trigger if smoothed score is high enough, OR if we have a recent peak.
+        Ring-buffer frame where the command recording should begin: the last
+        detection point minus the configured pre-roll, so words spoken in the
+        same breath as the wake word are kept.
         """
-        if name not in self.score_history:
-            return False
-        
-        # Get the last few raw scores
-        recent_scores = self.score_history[name][-3:] if len(self.score_history[name]) >= 3 else self.score_history[name]
-        max_recent = max(recent_scores) if recent_scores else 0
-        
-        # Trigger if:
-        # 1. Smoothed score is above threshold, OR
-        # 2. Any of the last 3 frames exceeded threshold * 2.5 (peak detection)
-        cond1 = smoothed_score >= self.config.threshold
-        cond2 = max_recent >= (self.config.threshold * 2.5)
-        
-        if max_recent > 0.05:  # Only log when there's actually a signal
-            print(f"[WakeWord DEBUG] {name}: smoothed={smoothed_score:.4f}, max_recent={max_recent:.4f}, "
-                  f"threshold={self.config.threshold}, peak_thresh={self.config.threshold * 2.5:.4f}, "
-                  f"cond1(smooth)={cond1}, cond2(peak)={cond2}, TRIGGER={cond1 or cond2}")
-        
-        return cond1 or cond2
+        if self.last_detection_frame is None:
+            return None
+        pre_roll = int(self.config.pre_roll_seconds * self.sample_rate)
+        return self.last_detection_frame - pre_roll
+
+    def _on_audio(self, block: np.ndarray) -> None:
+        """Source subscriber: convert float32 block to int16 for openWakeWord."""
+        pcm = (np.clip(block, -1.0, 1.0) * 32767).astype(np.int16)
+        # The source writes its ring buffer before notifying subscribers, so
+        # this is the ring position just past `block`.
+        frame = (self.source.ring.frames_written, pcm)
+        # Runs on the audio thread: never block. If inference has fallen
+        # behind, drop the oldest frame so detection stays on recent audio.
+        while True:
+            try:
+                self._frames.put_nowait(frame)
+                break
+            except queue.Full:
+                try:
+                    self._frames.get_nowait()
+                    self.dropped_frames += 1
+                except queue.Empty:
+                    pass
+        depth = self._frames.qsize()
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def stats(self) -> Dict[str, Any]:
+        """Frame and callback counters, for spotting an overloaded detector."""
+        return {
+            "frames": self.frames_processed,
+            "dropped_frames": self.dropped_frames,
+            "input_overflows": self.source.overflows if self.source is not None else 0,
+            "queue_depth": self._frames.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "skipped_callbacks": self.skipped_callbacks,
+        }
+
+    def _dispatch(self, on_detect: Callable[[], None]) -> None:
+        """Run on_detect() on the callback executor; skip if the last one is still busy."""
+        if self._callback_future is not None and not self._callback_future.done():
+            self.skipped_callbacks += 1
+            print("[WakeWord] Previous wake callback still running; skipping.")
+            return
+
+        def call() -> None:
+            try:
+                on_detect()
+            except Exception as e:
+                print(f"[WakeWord] Wake callback failed: {e}")
+
+        self._callback_future = self._callbacks.submit(call)
 
     def run(self, on_detect: Callable[[], None]) -> None:
         """
-        Blocking loop: listens on mic and calls on_detect()
-        whenever a wakeword score passes the threshold.
+        Blocking inference loop: listens on the shared mic source and calls
+        on_detect() on the callback executor whenever a wakeword score passes
+        the threshold. Returns after stop().
         """
         print(
             f"[WakeWord] Listening at {self.sample_rate} Hz, "
@@ -114,57 +292,50 @@ class WakeWordDetector:
             model_display = model_display.split("/")[-1].split("\\")[-1].replace("_v0.1.tflite", "")
         print(f"[WakeWord] Waiting for wake word: '{model_display}'...")
 
-        frame_count = 0
+        if self.source is None:
+            self.source = MicrophoneStream(
+                AudioConfig(sample_rate=self.sample_rate, block_size=self.frame_length)
+            )
+
+        reported_drops = 0
+        self._stop.clear()
+        self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="echo-wake-cb")
+        self.source.subscribe(self._on_audio)
+        self.source.start()
         try:
-            with sd.RawInputStream(
-                samplerate=self.sample_rate,
-                blocksize=self.frame_length,
-                dtype="int16",
-                channels=1,
-            ) as audio_stream:
-                while True:
-                    frame, _ = audio_stream.read(self.frame_length)
-                    if not frame:
-                        continue
-
-                    audio = np.frombuffer(frame, dtype=np.int16)
-
-                    preds = self.model.predict(audio)
-
-                    # Apply smoothing to each score
-                    smoothed_preds = {}
-                    for name, score in preds.items():
-                        smoothed_preds[name] = self._smooth_score(name, score)
-
-                    frame_count += 1
-                    if frame_count % 10 == 0:
-                        print(f"[WakeWord] Raw scores: {preds}")
-                        print(f"[WakeWord] Smoothed: {smoothed_preds}")
-
-                    # Check if any chosen model passes smoothed threshold
-                    for name, smoothed_score in smoothed_preds.items():
-                        should_trigger = self._should_trigger(name, smoothed_score)
-                        
-                        if self.target_model_names:
-                            # If specific models configured, only trigger on those
-                            is_in_models = name in self.target_model_names
-                        else:
-                            # If no specific models configured, accept any
-                            is_in_models = True
-                        
-                        # Debug: show trigger status
-                        if should_trigger:
-                            if name in self.score_history and self.score_history[name]:
-                                max_recent = max(self.score_history[name][-3:]) if len(self.score_history[name]) >= 3 else 0
-                                print(f"[WakeWord] TRIGGER: '{name}', max={max_recent:.3f}, in_models={is_in_models}, targets={self.target_model_names}")
-                        
-                        if should_trigger and is_in_models:
-                            print(f"[WakeWord] DETECTED '{name}' with smoothed score {smoothed_score:.3f}")
-                            on_detect()
-                            # After a wake, clear the history to avoid re-triggering
-                            self.score_history[name] = []
-                            # After a wake, don't immediately re-trigger on same audio
-                            break
+            while not self._stop.is_set():
+                try:
+                    position, audio = self._frames.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+                preds = self.model.predict(audio)
+                detection = self._detect(preds)
+
+                self.frames_processed += 1
+                if self.frames_processed % 10 == 0 and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Raw scores: %s", preds)
+                    logger.debug("Smoothed: %s", dict(zip(self.smoother.names, self.smoother.smoothed)))
+
+                if detection is not None:
+                    name, smoothed_score = detection
+                    print(f"[WakeWord] DETECTED '{name}' with smoothed score {smoothed_score:.3f}")
+                    self.last_detection_frame = position
+                    self._dispatch(on_detect)
+                    # After a wake, clear the history to avoid re-triggering
+                    self.smoother.reset(self.smoother.names.index(name))
+                    self.model.reset()
+
+                if self.dropped_frames != reported_drops and self.frames_processed % 50 == 0:
+                    print(
+                        f"[WakeWord] Inference falling behind: "
+                        f"{self.dropped_frames - reported_drops} frames dropped"
+                    )
+                    reported_drops = self.dropped_frames
         except Exception as e:
             print(f"[WakeWord] Error in detection loop: {e}")
             raise
+        finally:
+            self.source.unsubscribe(self._on_audio)
+            self._callbacks.shutdown(wait=False)
+            print(f"[WakeWord] Stopped. {self.stats()}")
@@ -23,10 +23,25 @@ def main() -> None:
             run_wake_listener(config)
             return
 
+        if mode == "download-models":
+            from .core.model_cache import ModelCache
+            ModelCache().download([config.wakeword_keyword] if config.wakeword_keyword else None)
+            return
+
+        if mode == "verify-models":
+            from .core.model_cache import ModelCache
+            problems = ModelCache().verify()
+            for problem in problems:
+                print(f"[ModelCache] {problem}")
+            print("[ModelCache] All cached models OK." if not problems else "[ModelCache] Verification failed.")
+            sys.exit(1 if problems else 0)
+
     print("[Echo Assistant] Available modes:")
-    print("  python -m echo_assistant.main voice-demo   # continuous 4s loop")
+    print("  python -m echo_assistant.main voice-demo   # continuous listen loop")
     print("  python -m echo_assistant.main hotkey       # Ctrl+Space to talk")
     print("  python -m echo_assistant.main wake         # wake-word (Porcupine) mode")
+    print("  python -m echo_assistant.main download-models  # fetch wake-word models for offline use")
+    print("  python -m echo_assistant.main verify-models    # re-hash cached wake-word models")
     print()
     print("Current config:")
     print(config)
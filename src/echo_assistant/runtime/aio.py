@@ -0,0 +1,102 @@
+"""
+aio.py
+Bridge between the threaded runtime and async code (e.g. Brain.astream_reply).
+
+An AsyncRunner owns one asyncio event loop on a daemon thread. Worker threads
+hand it coroutines or async generators and get back plain futures / iterators
+that can be cancelled from any thread, which aborts the underlying request
+instead of waiting for it to finish.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class AsyncRunner:
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "AsyncRunner":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="echo-asyncio", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, agen: AsyncIterator[T]) -> "CancellableStream[T]":
+        """Consume an async iterator from a regular thread."""
+        return CancellableStream(self.loop, agen)
+
+
+class CancellableStream(Iterator[T]):
+    """
+    Synchronous iterator over an async iterator running on another loop.
+
+    cancel() (alias close()) may be called from any thread: it cancels the
+    task driving the async iterator and ends iteration.
+    """
+
+    _DONE = object()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, agen: AsyncIterator[T]) -> None:
+        self._items: "queue.Queue[Any]" = queue.Queue()
+        self._future = asyncio.run_coroutine_threadsafe(self._pump(agen), loop)
+
+    async def _pump(self, agen: AsyncIterator[T]) -> None:
+        try:
+            async for item in agen:
+                self._items.put(item)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self._items.put(e)
+        finally:
+            aclose = getattr(agen, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self._items.put(self._DONE)
+
+    def __iter__(self) -> "CancellableStream[T]":
+        return self
+
+    def __next__(self) -> T:
+        item = self._items.get()
+        if item is self._DONE:
+            self._items.put(self._DONE)  # keep later next() calls terminating
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def cancel(self) -> None:
+        self._future.cancel()
+        # Unblock a waiting consumer even if the task never got to run
+        self._items.put(self._DONE)
+
+    close = cancel
@@ -8,44 +8,30 @@ from __future__ import annotations
 import keyboard
 from ..config import Config
 from .loop import build_components
-from ..ui.notify import show_popup
+from .pipeline import VoicePipeline
 
 
 def run_hotkey_listener(config: Config):
     recorder, stt_engine, tts_engine, router = build_components(config)
+    pipeline = VoicePipeline(config, recorder, stt_engine, tts_engine, router).start()
 
     print(f"[Hotkey] Assistant running. Press {config.hotkey} to speak. Say 'exit assistant' to quit.")
-    if config.response_mode.lower() == "popup":
-        show_popup("E.C.H.O.", f"{config.assistant_name} is active. Press {config.hotkey} to talk.")
-    else:
-        tts_engine.speak(f"{config.assistant_name} is active. Press {config.hotkey} to talk.")
+    pipeline.say(f"{config.assistant_name} is active. Press {config.hotkey} to talk.")
 
     def on_hotkey():
-        print("\n[Hotkey] Listening...")
-        audio = recorder.record(seconds=5.0)   # adjustable later
-        text, _ = stt_engine.transcribe(audio)
-
-        if not text.strip():
-            tts_engine.speak("I didn't catch that.")
+        # Runs on the keyboard hook thread: hand off and return immediately.
+        if pipeline.submit(fixed_seconds=5.0) is None:
+            print("[Hotkey] Already listening; ignoring press.")
             return
+        print("\n[Hotkey] Listening...")
 
-        result = router.route(text)
-
-        if result.kind == "chat":
-            if config.response_mode.lower() == "popup":
-                show_popup("E.C.H.O.", result.reply)
-            else:
-                tts_engine.speak(result.reply)
-        else:
-            # control commands: run silently
+    hotkey_handle = keyboard.add_hotkey(config.hotkey, on_hotkey)
+    try:
+        # keeps script alive until "exit assistant" (timeout keeps Ctrl+C responsive)
+        while not pipeline.exit_requested.wait(0.5):
             pass
-
-        if result.should_exit:
-            if config.response_mode.lower() == "popup":
-                show_popup("E.C.H.O.", "Goodbye.")
-            else:
-                tts_engine.speak("Goodbye.")
-            raise SystemExit
-
-    keyboard.add_hotkey(config.hotkey, on_hotkey)
-    keyboard.wait()   # keeps script alive
+    finally:
+        keyboard.remove_hotkey(hotkey_handle)
+        pipeline.stop()
+        recorder.close()
+        router.brain.close()
@@ -11,27 +11,77 @@ Orchestration only:
 
 from __future__ import annotations
 
-from typing import Optional
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+import numpy as np
 
 from ..config import Config
-from ..ui.notify import show_popup
-from ..core.audio import AudioConfig, AudioRecorder
+from ..core.audio import AudioConfig, AudioRecorder, EndpointConfig
 from ..core.stt import STTConfig, STTEngine
 from ..core.tts import TTSConfig, TTSEngine
 from ..core.brain import Brain, BrainConfig
+from ..core.classifier import IntentClassifier
 from ..core.router import Router
+from ..skills.registry import load_registry
+from .aio import AsyncRunner
+
+T = TypeVar("T")
+
+
+def load_timed(name: str, factory: Callable[[], T], warmup: bool = True) -> T:
+    """
+    Build one component, optionally run its warmup() (a dummy inference to
+    fill caches), and report how long each step took.
+    """
+    t0 = time.perf_counter()
+    component = factory()
+    t1 = time.perf_counter()
+    warm = getattr(component, "warmup", None)
+    if warmup and callable(warm):
+        try:
+            warm()
+        except Exception as e:
+            print(f"[Startup] {name} warmup failed: {e}")
+    t2 = time.perf_counter()
+    print(f"[Startup] {name}: loaded in {t1 - t0:.2f}s, warmed in {t2 - t1:.2f}s")
+    return component
+
+
+def preload_async(name: str, factory: Callable[[], T], warmup: bool = True) -> "Future[T]":
+    """
+    Start loading a component on a background thread; call .result() on the
+    returned future when it is needed.
+    """
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"echo-load-{name}")
+    future = pool.submit(load_timed, name, factory, warmup)
+    pool.shutdown(wait=False)
+    return future
 
 
 def build_components(config: Config):
     """
     Construct all core components from the config.
+
+    With `config.parallel_startup`, the Whisper model and brain/router load on
+    worker threads while TTS initialises on the calling thread (its speech
+    driver lives on the TTS engine's own synthesis thread).
     """
+    t0 = time.perf_counter()
+    warmup = config.warmup_models
+
     # Audio
     audio_cfg = AudioConfig(
         sample_rate=config.sample_rate,
         channels=config.audio_channels,
     )
-    recorder = AudioRecorder(audio_cfg)
+    endpoint_cfg = EndpointConfig(
+        trailing_silence_ms=config.endpoint_silence_ms,
+        min_utterance_seconds=config.min_utterance_seconds,
+        max_utterance_seconds=config.max_utterance_seconds,
+    )
+    recorder = AudioRecorder(audio_cfg, endpoint=endpoint_cfg)
 
     # STT
     stt_cfg = STTConfig(
@@ -40,78 +90,143 @@ def build_components(config: Config):
         compute_type=config.stt_compute_type,
         language=config.language,
     )
-    stt_engine = STTEngine(stt_cfg)
 
     # TTS
-    tts_cfg = TTSConfig()
-    tts_engine = TTSEngine(tts_cfg)
+    tts_cfg = TTSConfig(
+        backend=config.tts_backend,
+        voice_name=config.tts_voice or None,
+        cache_enabled=config.tts_cache,
+    )
 
     # Brain + Router
     brain_cfg = BrainConfig(
         backend=config.llm_backend,
         assistant_name=config.assistant_name,
+        cache_enabled=config.response_cache,
+        cache_ttl_seconds=config.response_cache_ttl,
+        context_tokens=config.context_tokens or None,
+        fallbacks=[b.strip() for b in config.llm_fallbacks.split(",") if b.strip()],
+        hedge_after_seconds=config.llm_hedge_seconds,
     )
-    brain = Brain(brain_cfg)
-    router = Router(brain)
 
+    def make_router() -> Router:
+        runner = AsyncRunner().start() if config.llm_async else None
+        registry = load_registry()
+        classifier = None
+        if config.intent_classifier:
+            classifier = IntentClassifier(
+                registry.intents(),
+                threshold=config.intent_threshold,
+                embed_model=config.intent_embed_model,
+            )
+        return Router(
+            Brain(brain_cfg),
+            runner=runner,
+            reply_deadline=config.llm_deadline_seconds,
+            classifier=classifier,
+            registry=registry,
+        )
+
+    if config.parallel_startup:
+        stt_future = preload_async("stt", lambda: STTEngine(stt_cfg), warmup)
+        router_future = preload_async("router", make_router, warmup)
+        tts_engine = load_timed("tts", lambda: TTSEngine(tts_cfg), warmup)
+        stt_engine = stt_future.result()
+        router = router_future.result()
+    else:
+        stt_engine = load_timed("stt", lambda: STTEngine(stt_cfg), warmup)
+        tts_engine = load_timed("tts", lambda: TTSEngine(tts_cfg), warmup)
+        router = load_timed("router", make_router, warmup)
+
+    print(f"[Startup] Components ready in {time.perf_counter() - t0:.2f}s")
     return recorder, stt_engine, tts_engine, router
 
 
+def capture_utterance(
+    recorder: AudioRecorder,
+    config: Config,
+    fixed_seconds: float,
+    start: Optional[int] = None,
+    live_from: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Record one command using the configured record mode.
+
+    In "endpoint" mode capture stops once the user goes quiet; in "fixed"
+    mode it records `fixed_seconds`. `start` is an optional ring-buffer
+    position in the past (pre-roll) to begin from; `live_from` is where the
+    pre-roll ends (e.g. the wake-word detection point).
+    """
+    if config.record_mode.lower() == "fixed":
+        return recorder.record(seconds=fixed_seconds, start=start)
+    return recorder.record_utterance(start=start, live_from=live_from)
+
+
+def listen_and_transcribe(
+    recorder: AudioRecorder,
+    stt_engine: STTEngine,
+    config: Config,
+    fixed_seconds: float,
+    start: Optional[int] = None,
+    live_from: Optional[int] = None,
+) -> Tuple[str, float]:
+    """
+    Capture one command and return (text, avg_logprob).
+
+    With streaming enabled (and endpoint recording), audio is decoded while
+    the user is still talking, so only a short tail is left to transcribe
+    once they stop.
+    """
+    if not config.stt_streaming or config.record_mode.lower() == "fixed":
+        audio = capture_utterance(recorder, config, fixed_seconds, start=start, live_from=live_from)
+        return stt_engine.transcribe(audio)
+
+    chunks = recorder.iter_utterance(start=start, live_from=live_from)
+    for partial in stt_engine.transcribe_stream(chunks):
+        if partial.is_final:
+            return partial.text, partial.avg_logprob
+        print(f"[STT] Partial: '{partial.text}'")
+    return "", float("nan")
+
+
 def run_basic_voice_loop(config: Optional[Config] = None) -> None:
     """
     Simple blocking loop:
-    - Records fixed-length chunks
+    - Records one utterance (until silence, or fixed-length chunks)
     - Transcribes
     - Routes to brain
     - Speaks reply
     - Stop when user says 'exit assistant' (or similar)
+
+    Each turn runs through the staged VoicePipeline; the loop just submits
+    the next turn once the previous one has finished.
     """
     from ..config import load_config
+    from .pipeline import VoicePipeline
 
     cfg = config or load_config()
     recorder, stt_engine, tts_engine, router = build_components(cfg)
 
+    pipeline = VoicePipeline(
+        cfg, recorder, stt_engine, tts_engine, router,
+        no_speech_reply="I did not catch that. Please try again.",
+    ).start()
+
     intro = (
         f"{cfg.assistant_name} voice loop started. "
         "Say something after the tone. Say 'exit assistant' to stop."
     )
-    if cfg.response_mode.lower() == "popup":
-        show_popup("E.C.H.O.", intro)
-    else:
-        tts_engine.speak(intro)
-
-    while True:
-        print("\n[Loop] Recording 4 seconds. Speak now...")
-        audio = recorder.record(seconds=4.0)
-
-        text, _score = stt_engine.transcribe(audio)
-        if not text.strip():
-            print("[Loop] No speech detected.")
-            if cfg.response_mode.lower() == "popup":
-                show_popup("E.C.H.O.", "I did not catch that. Please try again.")
-            else:
-                tts_engine.speak("I did not catch that. Please try again.")
-            continue
-
-        print(f"[Loop] You said: {text!r}")
-
-        result = router.route(text)
-        print(f"[Loop] Assistant reply: {result.reply!r}")
-
-        if result.kind == "chat":
-            if cfg.response_mode.lower() == "popup":
-                show_popup("E.C.H.O.", result.reply)
-            else:
-                tts_engine.speak(result.reply)
-        else:
-            # control commands: silent
-            pass
-
-        if result.should_exit:
-            if cfg.response_mode.lower() == "popup":
-                show_popup("E.C.H.O.", "Goodbye.")
-            else:
-                tts_engine.speak("Goodbye.")
-            break
+    pipeline.say(intro)
+
+    try:
+        while not pipeline.exit_requested.is_set():
+            print("\n[Loop] Listening. Speak now...")
+            turn = pipeline.submit(fixed_seconds=4.0)
+            if turn is not None:
+                turn.done.wait()
+    finally:
+        pipeline.stop()
+        recorder.close()
+        router.brain.close()
 
     print("[Loop] Exiting voice loop.")
@@ -0,0 +1,322 @@
+"""
+pipeline.py
+Staged, queue-based voice pipeline for Echo Assistant.
+
+Each interaction ("turn") flows through three stages, each with its own
+worker thread and a bounded queue in front of it:
+
+    listen  (capture + STT)  ->  think  (Router / Brain)  ->  respond  (TTS / popup)
+
+Triggers (hotkey, wake word, loop) only submit a turn and return, so the
+keyboard / wake-word threads never block on STT, the LLM or speech. A new
+turn cancels older ones that are still thinking or responding, and stops
+their speech immediately.
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+import traceback
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from ..config import Config
+from ..core.audio import AudioRecorder
+from ..core.router import RouteResult, Router
+from ..core.stt import STTEngine
+from ..core.tts import TTSEngine, iter_sentences
+from ..ui.notify import show_popup
+from .loop import listen_and_transcribe
+
+
+@dataclass
+class Turn:
+    id: int
+    fixed_seconds: float = 4.0
+    start: Optional[int] = None      # ring-buffer position to capture from (pre-roll)
+    live_from: Optional[int] = None  # where the pre-roll ends (wake-word detection)
+    text: str = ""
+    result: Optional[RouteResult] = None
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    done: threading.Event = field(default_factory=threading.Event)
+    _cancel_hooks: List[Callable[[], None]] = field(default_factory=list)
+
+    def on_cancel(self, hook: Callable[[], None]) -> None:
+        """Run `hook` when the turn is cancelled (immediately if it already is)."""
+        self._cancel_hooks.append(hook)
+        if self.cancelled.is_set():
+            hook()
+
+    def cancel(self) -> None:
+        if self.cancelled.is_set():
+            return
+        self.cancelled.set()
+        for hook in list(self._cancel_hooks):
+            try:
+                hook()
+            except Exception as e:
+                print(f"[Pipeline] Cancel hook failed: {e}")
+
+
+class VoicePipeline:
+    def __init__(
+        self,
+        config: Config,
+        recorder: AudioRecorder,
+        stt_engine: STTEngine,
+        tts_engine: TTSEngine,
+        router: Router,
+        queue_size: int = 2,
+        text_filter: Optional[Callable[[str], str]] = None,
+        no_speech_reply: str = "I didn't catch that.",
+        exit_reply: str = "Goodbye.",
+        on_exit: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.config = config
+        self.recorder = recorder
+        self.stt_engine = stt_engine
+        self.tts_engine = tts_engine
+        self.router = router
+        self.text_filter = text_filter
+        self.no_speech_reply = no_speech_reply
+        self.exit_reply = exit_reply
+        self.on_exit = on_exit
+
+        # Only one capture at a time: the mic belongs to one speaker.
+        self._listen_q: "queue.Queue[Turn]" = queue.Queue(maxsize=1)
+        self._think_q: "queue.Queue[Turn]" = queue.Queue(maxsize=queue_size)
+        self._respond_q: "queue.Queue[Turn]" = queue.Queue(maxsize=queue_size)
+
+        self._ids = itertools.count(1)
+        self._active: List[Turn] = []
+        self._lock = threading.Lock()
+        self._listening = threading.Event()
+        self._stopped = threading.Event()
+        self.exit_requested = threading.Event()
+        self._workers: List[threading.Thread] = []
+
+    # ---- Lifecycle ----
+
+    def start(self) -> "VoicePipeline":
+        stages = [
+            ("listen", self._listen_q, self._listen),
+            ("think", self._think_q, self._think),
+            ("respond", self._respond_q, self._respond),
+        ]
+        for name, q, handler in stages:
+            t = threading.Thread(
+                target=self._worker, args=(q, handler), name=f"echo-{name}", daemon=True
+            )
+            t.start()
+            self._workers.append(t)
+        return self
+
+    def stop(self) -> None:
+        self.cancel()
+        self._stopped.set()
+
+    # ---- Control ----
+
+    def submit(
+        self,
+        fixed_seconds: float = 4.0,
+        start: Optional[int] = None,
+        live_from: Optional[int] = None,
+    ) -> Optional[Turn]:
+        """
+        Start a new turn. Returns None (and does nothing) if a capture is
+        already in progress, so repeated triggers don't pile up threads.
+        """
+        if self._stopped.is_set() or self._listening.is_set():
+            return None
+
+        turn = Turn(id=next(self._ids), fixed_seconds=fixed_seconds, start=start, live_from=live_from)
+        try:
+            self._listen_q.put_nowait(turn)
+        except queue.Full:
+            return None
+
+        # The user started a new command: anything older is stale.
+        with self._lock:
+            for old in self._active:
+                old.cancel()
+            self._active = [turn]
+        return turn
+
+    def cancel(self) -> None:
+        """Cancel every in-flight turn."""
+        with self._lock:
+            for turn in self._active:
+                turn.cancel()
+            self._active = []
+
+    def say(self, text: str) -> None:
+        """Reply through the configured channel (voice or popup)."""
+        if self.config.response_mode.lower() == "popup":
+            show_popup("E.C.H.O.", text)
+        else:
+            self.tts_engine.speak(text)
+
+    # ---- Stages ----
+
+    def _worker(self, q: "queue.Queue[Turn]", handler: Callable[[Turn], Optional[queue.Queue]]) -> None:
+        while not self._stopped.is_set():
+            try:
+                turn = q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            next_q = None
+            if not turn.cancelled.is_set():
+                try:
+                    next_q = handler(turn)
+                except Exception as e:
+                    print(f"[Pipeline] Turn {turn.id} failed: {e}")
+                    traceback.print_exc()
+
+            if next_q is None or not self._forward(turn, next_q):
+                self._finish(turn)
+
+    def _forward(self, turn: Turn, q: "queue.Queue[Turn]") -> bool:
+        """Blocking put that gives up if the turn is cancelled meanwhile."""
+        while not turn.cancelled.is_set() and not self._stopped.is_set():
+            try:
+                q.put(turn, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _finish(self, turn: Turn) -> None:
+        with self._lock:
+            if turn in self._active:
+                self._active.remove(turn)
+        turn.done.set()
+
+    def _listen(self, turn: Turn) -> Optional[queue.Queue]:
+        self._listening.set()
+        try:
+            text, _ = listen_and_transcribe(
+                self.recorder,
+                self.stt_engine,
+                self.config,
+                fixed_seconds=turn.fixed_seconds,
+                start=turn.start,
+                live_from=turn.live_from,
+            )
+        finally:
+            self._listening.clear()
+
+        if self.text_filter:
+            text = self.text_filter(text)
+        turn.text = text.strip()
+
+        if not turn.text:
+            turn.result = RouteResult(kind="chat", reply=self.no_speech_reply)
+            return self._respond_q
+
+        print(f"[Pipeline] You said: {turn.text!r}")
+        return self._think_q
+
+    def _think(self, turn: Turn) -> Optional[queue.Queue]:
+        turn.result = self.router.route(turn.text, stream=self.config.stream_replies)
+        if turn.result.stream is None:
+            print(f"[Pipeline] Assistant reply: {turn.result.reply!r}")
+        return self._respond_q
+
+    def _respond(self, turn: Turn) -> Optional[queue.Queue]:
+        result = turn.result
+        if result is None:
+            return None
+
+        # Barge-in: a newer turn (wake word, hotkey) cuts this reply off mid-word.
+        turn.on_cancel(self.tts_engine.stop)
+
+        if result.stream is not None:
+            self._respond_stream(turn, result)
+        elif result.kind == "chat":
+            self.say(result.reply)
+        # control commands: performed silently
+
+        if result.should_exit:
+            self.say(self.exit_reply)
+            self.exit_requested.set()
+            if self.on_exit:
+                self.on_exit()
+        return None
+
+    def _respond_stream(self, turn: Turn, result: RouteResult) -> None:
+        """
+        Speak a streamed reply one sentence at a time. The LLM keeps
+        generating on a helper thread while earlier sentences are spoken.
+        """
+        if self.config.response_mode.lower() == "popup":
+            result.reply = "".join(result.stream).strip()
+            print(f"[Pipeline] Assistant reply: {result.reply!r}")
+            show_popup("E.C.H.O.", result.reply)
+            return
+
+        # Async streams can be aborted the moment the turn is cancelled,
+        # freeing the request instead of letting it run on in the background.
+        cancel = getattr(result.stream, "cancel", None)
+        if cancel:
+            turn.on_cancel(cancel)
+
+        # Each sentence is rendered here while the previous one plays.
+        spoken = []
+        for sentence in _prefetch(iter_sentences(result.stream), turn.cancelled):
+            if turn.cancelled.is_set():
+                break
+            spoken.append(sentence)
+            self.tts_engine.say_async(sentence, cache=False)
+        self.tts_engine.wait()
+        result.reply = " ".join(spoken)
+        print(f"[Pipeline] Assistant reply: {result.reply!r}")
+
+
+def _prefetch(items: Iterable[str], cancelled: threading.Event, size: int = 8) -> Iterator[str]:
+    """
+    Pull `items` on a background thread into a bounded queue, so a slow
+    consumer (speech) doesn't stall the producer (LLM stream). Stops as
+    soon as `cancelled` is set, even if the producer is stuck waiting.
+    """
+    done = object()
+    q: "queue.Queue" = queue.Queue(maxsize=size)
+    source = iter(items)
+
+    def pump() -> None:
+        try:
+            for item in source:
+                while not cancelled.is_set():
+                    try:
+                        q.put(item, timeout=0.2)
+                        break
+                    except queue.Full:
+                        continue
+                if cancelled.is_set():
+                    break
+        except Exception as e:
+            print(f"[Pipeline] Reply stream failed: {e}")
+        finally:
+            close = getattr(source, "close", None)
+            if cancelled.is_set() and close:
+                close()
+            while True:
+                try:
+                    q.put(done, timeout=0.2)
+                    break
+                except queue.Full:
+                    if cancelled.is_set():
+                        break  # consumer already gave up
+
+    threading.Thread(target=pump, name="echo-reply-stream", daemon=True).start()
+    while not cancelled.is_set():
+        try:
+            item = q.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        if item is done:
+            return
+        yield item
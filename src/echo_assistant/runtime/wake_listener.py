@@ -5,70 +5,82 @@ Always-on wake-word listener that triggers the voice assistant pipeline.
 
 from __future__ import annotations
 
+import re
+from typing import List
+
 from ..config import Config
-from .loop import build_components
+from .loop import build_components, preload_async
+from .pipeline import VoicePipeline
 
 from ..core.wakeword import WakeWordConfig, WakeWordDetector
-from ..ui.notify import show_popup
-
-def run_wake_listener(config: Config) -> None:
-    recorder, stt_engine, tts_engine, router = build_components(config)
-
-    # Available models: "hey jarvis", "alexa", "computer", "jarvis", etc.
-    wake_models = ["hey jarvis"]
-
-    tts_engine.speak(
-        f"{config.assistant_name} wake-word mode enabled. "
-        f"Say 'hey Jarvis' to talk to me."
-    )
-
-    should_exit = False
-
-    def on_wake():
-        nonlocal should_exit
-        try:
-            print("\n[Wake] WAKE WORD TRIGGERED - Recording user input...")
-            audio = recorder.record(seconds=4.0)
-            text, _ = stt_engine.transcribe(audio)
-
-            if not text.strip():
-                tts_engine.speak("I didn't catch that. Please try again.")
-                return
 
-            print(f"[Wake] You said: {text!r}")
-            result = router.route(text)
-            print(f"[Wake] Assistant reply: {result.reply!r}")
+def _wake_phrase_pattern(wake_models: List[str]) -> "re.Pattern[str]":
+    """
+    Regex matching a leading wake phrase (or its tail, e.g. just "jarvis")
+    in a transcript. Pre-roll audio means Whisper often hears it.
+    """
+    variants = set()
+    for name in wake_models:
+        words = name.replace("_", " ").split()
+        for i in range(len(words)):
+            variants.add(r"\W+".join(re.escape(w) for w in words[i:]))
+    alternatives = "|".join(sorted(variants, key=len, reverse=True))
+    return re.compile(rf"^\W*(?:{alternatives})\b\W*", re.IGNORECASE)
 
-            if result.kind == "chat":
-                if config.response_mode.lower() == "popup":
-                    show_popup("E.C.H.O.", result.reply)
-                else:
-                    tts_engine.speak(result.reply)
-            else:
-                # Control commands: perform action silently (no TTS) per request
-                pass
 
-            if result.should_exit:
-                if config.response_mode.lower() != "popup":
-                    tts_engine.speak("Shutting down wake-word mode. Goodbye.")
-                else:
-                    show_popup("E.C.H.O.", "Shutting down wake-word mode. Goodbye.")
-                should_exit = True
-        except Exception as e:
-            print(f"[Wake] Error in on_wake callback: {e}")
-            import traceback
-            traceback.print_exc()
+def run_wake_listener(config: Config) -> None:
+    # WAKEWORD_KEYWORD: "hey jarvis", "alexa", "hey mycroft", etc. Must match
+    # what `main.py download-models` put in the local model cache.
+    wake_word = config.wakeword_keyword or "hey jarvis"
+    wake_models = [wake_word]
+    wake_phrase = _wake_phrase_pattern(wake_models)
 
     ww_cfg = WakeWordConfig(
         model_names=wake_models,
         threshold=0.1,
         smoothing_window=5,
+        pre_roll_seconds=config.wake_pre_roll_ms / 1000.0,
     )
-    
+
+    # Load the wake-word models alongside Whisper/TTS instead of after them
     print(f"[Wake] Initializing detector with models: {wake_models}")
-    detector = WakeWordDetector(ww_cfg)
+    detector_future = preload_async(
+        "wakeword", lambda: WakeWordDetector(ww_cfg), config.warmup_models
+    )
+    recorder, stt_engine, tts_engine, router = build_components(config)
+    detector = detector_future.result()
+    # Share the recorder's microphone stream with the detector
+    detector.source = recorder.stream
+    # Keep listening while replies play, so the wake word can interrupt them
+    detector.is_playing = tts_engine.speaking.is_set
     print(f"[Wake] Detector ready. Target models: {detector.target_model_names}")
-    
+
+    tts_engine.speak(
+        f"{config.assistant_name} wake-word mode enabled. "
+        f"Say '{wake_word}' to talk to me."
+    )
+
+    pipeline = VoicePipeline(
+        config, recorder, stt_engine, tts_engine, router,
+        text_filter=lambda text: wake_phrase.sub("", text, count=1),
+        no_speech_reply="I didn't catch that. Please try again.",
+        exit_reply="Shutting down wake-word mode. Goodbye.",
+        on_exit=detector.stop,
+    ).start()
+
+    def on_wake():
+        # Runs on the detector's callback thread: hand the turn to the
+        # pipeline and return, so the next wake word can be dispatched.
+        turn = pipeline.submit(
+            fixed_seconds=4.0,
+            start=detector.utterance_start(),
+            live_from=detector.last_detection_frame,
+        )
+        if turn is None:
+            print("[Wake] Already listening; ignoring wake word.")
+            return
+        print("\n[Wake] WAKE WORD TRIGGERED - Recording user input...")
+
     try:
         detector.run(on_detect=on_wake)
     except KeyboardInterrupt:
@@ -80,6 +92,9 @@ def run_wake_listener(config: Config) -> None:
         import traceback
         traceback.print_exc()
         raise
-    
-    if should_exit:
+    finally:
+        pipeline.stop()
+        router.brain.close()
+
+    if pipeline.exit_requested.is_set():
         raise SystemExit
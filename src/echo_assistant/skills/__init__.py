@@ -1,10 +1,9 @@
 """
 skills package
 
-We keep this empty for now.
-Specific skills are imported directly where needed:
-- from ..skills.system_control import open_app
-- from ..skills.web_search import search_web
+Skills are declared in registry.py (triggers + "module:function" entry point)
+and imported lazily the first time they're used; installed packages can add
+more through the "echo_assistant.skills" entry point group.
 """
 
 __all__: list[str] = []
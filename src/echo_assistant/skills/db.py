@@ -0,0 +1,78 @@
+"""
+db.py
+Shared SQLite helpers for skills that keep local data (memory, notes).
+
+- One connection per database file, WAL journal: appends are a single
+  small transaction and a crash can't leave a half-written file behind
+- FTS5 full-text indexes (BM25 ranking, phrase and prefix queries)
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import threading
+from typing import Dict, List
+
+_connections: Dict[str, sqlite3.Connection] = {}
+_lock = threading.Lock()
+
+# Words that carry no meaning for a lookup ("what do you know about my ...")
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "at", "by", "with",
+    "is", "are", "was", "were", "be", "it", "its", "my", "me", "i", "you", "your",
+    "about", "what", "do", "did", "that", "this", "any", "some",
+}
+
+# Terms shorter than this are matched exactly, not as prefixes ("al"* would
+# match half the vocabulary)
+MIN_PREFIX_CHARS = 3
+
+_POSSESSIVE = re.compile(r"['’]s\b")
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Shared connection to `path`, created on first use."""
+    with _lock:
+        conn = _connections.get(path)
+        if conn is None:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _connections[path] = conn
+        return conn
+
+
+def close(path: str) -> None:
+    with _lock:
+        conn = _connections.pop(path, None)
+    if conn is not None:
+        conn.close()
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercase word tokens minus stopwords, possessives and single letters."""
+    words = re.findall(r"\w+", _POSSESSIVE.sub("", text.lower()))
+    return [w for w in words if len(w) > 1 and w not in STOPWORDS]
+
+
+def fts_query(text: str, mode: str = "or", prefix: bool = True) -> str:
+    """
+    FTS5 MATCH expression for free text, safe against FTS syntax in the input.
+
+    "quoted parts" become phrase queries; other words become (prefix) terms
+    joined with OR (any word, ranked by BM25) or AND (all words).
+    """
+    parts: List[str] = []
+    for phrase in re.findall(r'"([^"]+)"', text):
+        words = re.findall(r"\w+", phrase.lower())
+        if words:
+            parts.append('"' + " ".join(words) + '"')
+    rest = re.sub(r'"[^"]*"', " ", text)
+    for word in tokens(rest):
+        if prefix and len(word) >= MIN_PREFIX_CHARS:
+            parts.append(f'"{word}"*')
+        else:
+            parts.append(f'"{word}"')
+    return f" {mode.upper()} ".join(parts)
@@ -8,12 +8,33 @@ from __future__ import annotations
 import urllib.parse
 import webbrowser
 
+from ..core.classifier import MAX_ARGUMENT_WORDS, clauses, starts_with_verb
+
+
+# Trailing words dropped from "play ..." requests
+_ENDINGS = ("on youtube", "on you tube", "from youtube", "on yt")
+
+
+def is_media_query(text: str) -> bool:
+    """True if `text` looks like something to play (used to vet fuzzy "put on ..." guesses)."""
+    words = text.split()
+    return (
+        0 < len(words) <= MAX_ARGUMENT_WORDS
+        and len(clauses(text)) == 1
+        and not starts_with_verb(text)
+        and words[0].lower() != "your"   # "put on your thinking cap"
+    )
+
 
 def play_youtube(query: str) -> str:
     """
     Open YouTube search for the given query in the default browser.
     """
     q = query.strip()
+    for ending in _ENDINGS:
+        if q.lower().endswith(ending):
+            q = q[: -len(ending)].strip(" ,.")
+            break
     if not q:
         return "What should I play on YouTube?"
 
@@ -1,57 +1,171 @@
 """
 memory.py
 Structured memory storage + retrieval for Echo.
+
+Facts live in SQLite (data/memory.db, WAL journal): storing one is a single
+small insert, and recall goes through an FTS5 inverted index ranked by BM25
+instead of scanning every fact. An old data/memory.json is imported once.
+With RECALL_EMBED_MODEL set, recall also finds facts by meaning (vectors.py).
 """
 
 from __future__ import annotations
-import os, json
+
+import json
+import os
+import threading
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, List
+
+from ..core.classifier import asks_something
+from . import db
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
-MEMORY_PATH = os.path.join(DATA_DIR, "memory.json")
+MEMORY_DB = os.path.join(DATA_DIR, "memory.db")
+MEMORY_PATH = os.path.join(DATA_DIR, "memory.json")  # legacy format, migrated on first use
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS facts (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    fact TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS facts_fts USING fts5(
+    fact, content='facts', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS facts_ai AFTER INSERT ON facts BEGIN
+    INSERT INTO facts_fts(rowid, fact) VALUES (new.id, new.fact);
+END;
+CREATE TRIGGER IF NOT EXISTS facts_ad AFTER DELETE ON facts BEGIN
+    INSERT INTO facts_fts(facts_fts, rowid, fact) VALUES ('delete', old.id, old.fact);
+END;
+"""
+
+_ready = False
+_setup_lock = threading.Lock()
 
 
 def _ensure_dir():
     os.makedirs(DATA_DIR, exist_ok=True)
 
 
-def _load_memory() -> List[Dict]:
+def _db():
+    global _ready
+    _ensure_dir()
+    conn = db.connect(MEMORY_DB)
+    if not _ready:
+        # Pipeline workers can get here together; set up and migrate once
+        with _setup_lock:
+            if not _ready:
+                conn.executescript(_SCHEMA)
+                _migrate_json(conn)
+                _ready = True
+    return conn
+
+
+def _migrate_json(conn) -> None:
+    """Import facts from the old memory.json, then set the file aside."""
     if not os.path.exists(MEMORY_PATH):
-        return []
-    with open(MEMORY_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+        return
+    if conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0] == 0:
+        try:
+            with open(MEMORY_PATH, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Memory] Could not import {MEMORY_PATH}: {e}")
+            return
+        with conn:
+            conn.executemany(
+                "INSERT INTO facts (timestamp, fact) VALUES (?, ?)",
+                [(e.get("timestamp", ""), e["fact"]) for e in entries if e.get("fact")],
+            )
+        print(f"[Memory] Imported {len(entries)} facts from {MEMORY_PATH}")
+    os.replace(MEMORY_PATH, MEMORY_PATH + ".migrated")
 
 
-def _save_memory(mem: List[Dict]):
-    with open(MEMORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(mem, f, indent=2)
+def _vector_index():
+    """Semantic index over facts, or None unless RECALL_EMBED_MODEL is set."""
+    if not os.getenv("RECALL_EMBED_MODEL"):
+        return None
+    from . import vectors
+    return vectors.get_index(os.path.join(DATA_DIR, "memory_vectors"))
 
 
-def store_memory(text: str) -> str:
-    _ensure_dir()
-    mem = _load_memory()
+def _facts_after(last_id: int):
+    return _db().execute("SELECT id, fact FROM facts WHERE id > ? ORDER BY id", (last_id,))
 
-    entry = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-        "fact": text.strip(),
-        "tags": text.lower().split(),  # basic tagging for now
-    }
 
-    mem.append(entry)
-    _save_memory(mem)
+def _facts_by_id(ids: List[int]) -> List[Dict]:
+    marks = ",".join("?" * len(ids))
+    rows = _db().execute(f"SELECT id, timestamp, fact FROM facts WHERE id IN ({marks})", ids)
+    return [dict(row) for row in rows]
+
+
+def is_memory_fact(text: str) -> bool:
+    """True if `text` reads like a fact to keep (used to vet fuzzy "remember ..." guesses)."""
+    return bool(text.strip()) and not asks_something(text)
+
+
+def store_memory(text: str) -> str:
+    conn = _db()
+    with conn:
+        conn.execute(
+            "INSERT INTO facts (timestamp, fact) VALUES (?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M"), text.strip()),
+        )
+
+    index = _vector_index()
+    if index is not None:
+        try:
+            index.sync(_facts_after)
+        except Exception as e:
+            print(f"[Memory] Could not update the vector index: {e}")
     return "Okay, I'll remember that."
 
 
+def search_memory(query: str, limit: int = 5) -> List[Dict]:
+    """
+    Facts matching the words of `query` (prefixes too), best BM25 match
+    first: facts containing every word are preferred; if there are none,
+    facts containing any word are returned. Merged with the closest facts by
+    meaning when vector recall is enabled. An empty query returns the most
+    recent facts.
+    """
+    conn = _db()
+    match = db.fts_query(query)
+    if not match:
+        rows = conn.execute(
+            "SELECT id, timestamp, fact FROM facts ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+    else:
+        for mode in ("and", "or"):
+            rows = conn.execute(
+                "SELECT f.id, f.timestamp, f.fact FROM facts_fts "
+                "JOIN facts f ON f.id = facts_fts.rowid "
+                "WHERE facts_fts MATCH ? ORDER BY bm25(facts_fts) LIMIT ?",
+                (db.fts_query(query, mode=mode), limit),
+            ).fetchall()
+            if rows:
+                break
+    matches = [dict(row) for row in rows]
+
+    index = _vector_index() if match else None
+    if index is not None:
+        from .vectors import hybrid_search
+        try:
+            index.sync(_facts_after)
+            matches = hybrid_search(index, query, matches, _facts_by_id, limit)
+        except Exception as e:
+            print(f"[Memory] Vector recall failed: {e}")
+    return matches
+
+
 def recall_memory(query: str) -> str:
-    mem = _load_memory()
-    if not mem:
+    conn = _db()
+    if conn.execute("SELECT 1 FROM facts LIMIT 1").fetchone() is None:
         return "I don't remember anything yet."
 
-    q = query.lower()
-    matches = [m for m in mem if q in m["fact"].lower() or q in m["tags"]]
-
+    matches = search_memory(query)
     if not matches:
         return f"I don't remember anything about {query}."
 
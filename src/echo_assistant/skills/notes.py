@@ -6,75 +6,212 @@ Features:
 - Add a note
 - List recent notes
 - Search notes by keyword
+
+Notes are stored in SQLite (data/notes.db) with an FTS5 index, so search is
+ranked (BM25), understands "exact phrases" and word prefixes, and "latest N"
+reads only N rows however many notes have piled up. An old data/notes.txt is
+imported once. With RECALL_EMBED_MODEL set, search also finds notes by
+meaning (vectors.py).
 """
 
 from __future__ import annotations
 
 import os
+import re
+import threading
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Tuple
+
+from ..core.classifier import asks_something
+from . import db
 
 # store notes in project root / data dir
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
-NOTES_PATH = os.path.join(DATA_DIR, "notes.txt")
+NOTES_DB = os.path.join(DATA_DIR, "notes.db")
+NOTES_PATH = os.path.join(DATA_DIR, "notes.txt")  # legacy format, migrated on first use
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    text, content='notes', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts(notes_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_LEGACY_LINE = re.compile(r"^\[(?P<timestamp>[^\]]*)\]\s?(?P<text>.*)$")
+
+_ready = False
+_setup_lock = threading.Lock()
 
 
 def _ensure_data_dir():
     os.makedirs(DATA_DIR, exist_ok=True)
 
 
+def _db():
+    global _ready
+    _ensure_data_dir()
+    conn = db.connect(NOTES_DB)
+    if not _ready:
+        # Pipeline workers can get here together; set up and migrate once
+        with _setup_lock:
+            if not _ready:
+                conn.executescript(_SCHEMA)
+                _migrate_txt(conn)
+                _ready = True
+    return conn
+
+
+def _migrate_txt(conn) -> None:
+    """Import notes from the old notes.txt, then set the file aside."""
+    if not os.path.exists(NOTES_PATH):
+        return
+    if conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 0:
+        rows = []
+        with open(NOTES_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.rstrip("\n")
+                if not line.strip():
+                    continue
+                m = _LEGACY_LINE.match(line)
+                rows.append((m["timestamp"], m["text"]) if m else ("", line))
+        with conn:
+            conn.executemany("INSERT INTO notes (timestamp, text) VALUES (?, ?)", rows)
+        print(f"[Notes] Imported {len(rows)} notes from {NOTES_PATH}")
+    os.replace(NOTES_PATH, NOTES_PATH + ".migrated")
+
+
+def _format(note: Dict) -> str:
+    return f"[{note['timestamp']}] {note['text']}"
+
+
+def _vector_index():
+    """Semantic index over notes, or None unless RECALL_EMBED_MODEL is set."""
+    if not os.getenv("RECALL_EMBED_MODEL"):
+        return None
+    from . import vectors
+    return vectors.get_index(os.path.join(DATA_DIR, "notes_vectors"))
+
+
+def _notes_after(last_id: int):
+    return _db().execute("SELECT id, text FROM notes WHERE id > ? ORDER BY id", (last_id,))
+
+
+def _notes_by_id(ids: List[int]) -> List[Dict]:
+    marks = ",".join("?" * len(ids))
+    rows = _db().execute(f"SELECT id, timestamp, text FROM notes WHERE id IN ({marks})", ids)
+    return [dict(row) for row in rows]
+
+
+def is_note_text(text: str) -> bool:
+    """True if `text` reads like a note to save (used to vet fuzzy "write down ..." guesses)."""
+    return bool(text.strip()) and not asks_something(text)
+
+
 def add_note(text: str) -> str:
     """
-    Append a note with timestamp to notes.txt
+    Save a note with a timestamp.
     """
-    _ensure_data_dir()
+    conn = _db()
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-    line = f"[{timestamp}] {text.strip()}\n"
+    with conn:
+        conn.execute("INSERT INTO notes (timestamp, text) VALUES (?, ?)", (timestamp, text.strip()))
+
+    index = _vector_index()
+    if index is not None:
+        try:
+            index.sync(_notes_after)
+        except Exception as e:
+            print(f"[Notes] Could not update the vector index: {e}")
+    return "Note saved."
 
-    with open(NOTES_PATH, "a", encoding="utf-8") as f:
-        f.write(line)
 
-    return "Note saved."
+def latest_notes(limit: int = 5) -> List[Dict]:
+    """The most recent `limit` notes, oldest first."""
+    rows = _db().execute(
+        "SELECT id, timestamp, text FROM notes ORDER BY id DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [dict(row) for row in reversed(rows)]
 
 
-def _load_notes() -> List[str]:
-    if not os.path.exists(NOTES_PATH):
-        return []
-    with open(NOTES_PATH, "r", encoding="utf-8") as f:
-        return [line.rstrip("\n") for line in f]
+def find_notes(query: str, limit: int = 5) -> Tuple[int, List[Dict]]:
+    """
+    (total matches, best `limit` notes) for `query`, ranked by BM25.
+    Notes containing every word are preferred; if there are none, notes
+    containing any word are returned. With vector recall enabled, notes
+    close in meaning are merged in.
+    """
+    total, rows = _keyword_search(query, limit)
+
+    index = _vector_index()
+    if index is not None:
+        from .vectors import hybrid_search
+        try:
+            index.sync(_notes_after)
+            rows = hybrid_search(index, query, rows, _notes_by_id, limit)
+            total = max(total, len(rows))
+        except Exception as e:
+            print(f"[Notes] Vector search failed: {e}")
+    return total, rows
+
+
+def _keyword_search(query: str, limit: int) -> Tuple[int, List[Dict]]:
+    conn = _db()
+    for mode in ("and", "or"):
+        match = db.fts_query(query, mode=mode)
+        if not match:
+            return 0, []
+        total = conn.execute(
+            "SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH ?", (match,)
+        ).fetchone()[0]
+        if total:
+            rows = conn.execute(
+                "SELECT n.id, n.timestamp, n.text FROM notes_fts "
+                "JOIN notes n ON n.id = notes_fts.rowid "
+                "WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts) LIMIT ?",
+                (match, limit),
+            ).fetchall()
+            return total, [dict(row) for row in rows]
+    return 0, []
 
 
 def list_notes(limit: int = 5) -> str:
     """
     Return the most recent `limit` notes as a single string.
     """
-    notes = _load_notes()
-    if not notes:
+    last_notes = latest_notes(limit)
+    if not last_notes:
         return "You have no notes yet."
 
-    last_notes = notes[-limit:]
     # Don't let TTS read 10 paragraphs at once
-    joined = " | ".join(last_notes)
+    joined = " | ".join(_format(n) for n in last_notes)
     return f"Your last {len(last_notes)} notes are: {joined}"
 
 
 def search_notes(query: str, limit: int = 5) -> str:
     """
-    Search notes containing the query (case-insensitive).
+    Search notes by keywords, "exact phrases" or word prefixes; best matches first.
     """
-    q = query.strip().lower()
+    q = query.strip()
     if not q:
         return "What should I search for in your notes?"
 
-    notes = _load_notes()
-    if not notes:
+    if _db().execute("SELECT 1 FROM notes LIMIT 1").fetchone() is None:
         return "You have no notes yet."
 
-    matches = [n for n in notes if q in n.lower()]
-    if not matches:
+    total, top = find_notes(q, limit)
+    if not top:
         return f"I couldn't find any notes containing '{query}'."
 
-    top = matches[-limit:]
-    joined = " | ".join(top)
-    return f"I found {len(matches)} notes matching '{query}'. Here are some: {joined}"
+    joined = " | ".join(_format(n) for n in top)
+    return f"I found {total} notes matching '{query}'. Here are some: {joined}"
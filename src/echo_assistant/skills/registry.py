@@ -0,0 +1,224 @@
+"""
+registry.py
+Skill registry for Echo.
+
+Each skill declares its triggers (an Intent) and an entry point
+("package.module:function"). Skill modules are only imported the first time
+one of their commands is used, so adding skills costs nothing at startup.
+
+Third-party skills plug in without editing the Router: a package exposes a
+Skill object (or a list of them) under the "echo_assistant.skills" entry
+point group, e.g. in its pyproject.toml:
+
+    [project.entry-points."echo_assistant.skills"]
+    weather = "echo_weather:SKILL"
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from ..core.classifier import is_question
+from ..core.intents import Intent
+
+ENTRY_POINT_GROUP = "echo_assistant.skills"
+
+
+@dataclass(frozen=True)
+class Skill:
+    intent: Intent
+    entry_point: str                 # "package.module:function", returns the spoken reply
+    takes_argument: bool = True      # call as fn(argument) rather than fn()
+    default_argument: str = ""       # used when the command comes without one
+    check: Optional[str] = None      # entry point of fn(argument) -> bool, vets fuzzy matches
+    statements_only: bool = False    # fuzzy matches on questions go to the Brain (skills that write data)
+
+    @property
+    def name(self) -> str:
+        return self.intent.name
+
+
+def load_entry_point(entry_point: str) -> Callable:
+    module_name, _, attr = entry_point.partition(":")
+    obj = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+# Built-in skills. Prefix triggers must start the utterance; phrase triggers
+# may appear anywhere. On overlap the higher priority wins, then the longer
+# trigger ("search my notes for" beats "search").
+BUILTIN_SKILLS = [
+    Skill(
+        Intent(
+            "list_notes",
+            phrases=(
+                "show my notes", "show me my notes", "read my notes",
+                "list my notes", "display my notes", "open my notes",
+            ),
+            priority=10,
+            examples=("what notes do i have", "read me my notes", "what's in my notes", "any notes"),
+        ),
+        "echo_assistant.skills.notes:list_notes",
+        takes_argument=False,
+    ),
+    Skill(
+        Intent(
+            "open_app",
+            prefixes=("open",),
+            requires_argument=True,
+            examples=("could you open {} for me", "can you open {}", "please open {}", "launch {}",
+                      "start {}", "fire up {}", "bring up {}", "open up {}"),
+            cues=("open up", "open", "launch", "start", "fire up", "bring up"),
+        ),
+        "echo_assistant.skills.system_control:open_app",
+        check="echo_assistant.skills.system_control:is_app_name",
+    ),
+    Skill(
+        Intent(
+            "search_web",
+            prefixes=("search for", "search"),
+            requires_argument=True,
+            examples=("look up {}", "google {}", "can you search the web for {}",
+                      "search online for {}", "look up {} online"),
+            cues=("look up", "google", "search the web for", "search online for", "search for"),
+        ),
+        "echo_assistant.skills.web_search:search_web",
+        check="echo_assistant.skills.web_search:is_search_query",
+    ),
+    Skill(
+        Intent(
+            "add_note",
+            prefixes=("take a note", "create a note", "note that"),
+            examples=("jot down {}", "write down {}", "make a note {}", "add a note {}",
+                      "please note {}", "add {} to my notes"),
+            cues=("jot down", "write down", "make a note", "add a note", "note"),
+        ),
+        "echo_assistant.skills.notes:add_note",
+        default_argument="Empty note.",
+        check="echo_assistant.skills.notes:is_note_text",
+        statements_only=True,
+    ),
+    Skill(
+        Intent(
+            "search_notes",
+            prefixes=("search my notes for", "find notes about"),
+            examples=("do i have any notes about {}", "look through my notes for {}",
+                      "find my notes on {}", "check my notes for {}"),
+            cues=("notes about", "notes on", "notes for", "my notes for"),
+        ),
+        "echo_assistant.skills.notes:search_notes",
+    ),
+    Skill(
+        Intent(
+            "play",
+            prefixes=("play",),
+            requires_argument=True,
+            examples=("put on {}", "can you play some {}", "i want to listen to {}", "queue up {}",
+                      "could you put on {} for me", "let's listen to {}"),
+            cues=("put on", "play some", "listen to", "queue up"),
+        ),
+        "echo_assistant.skills.media:play_youtube",
+        check="echo_assistant.skills.media:is_media_query",
+    ),
+    Skill(
+        Intent(
+            "store_memory",
+            prefixes=("remember that", "remember to", "remember"),
+            examples=("don't let me forget {}", "keep in mind {}", "make sure you remember {}",
+                      "please remember {}"),
+            cues=("don't let me forget", "keep in mind that", "keep in mind", "remember that", "remember"),
+        ),
+        "echo_assistant.skills.memory:store_memory",
+        default_argument="Blank memory.",
+        check="echo_assistant.skills.memory:is_memory_fact",
+        statements_only=True,
+    ),
+    Skill(
+        Intent(
+            "recall_memory",
+            prefixes=("what do you remember about", "what do you know about", "recall"),
+            examples=("do you remember {}", "what did i tell you about {}",
+                      "what have i told you about {}"),
+            cues=("do you remember", "tell you about", "told you about"),
+        ),
+        "echo_assistant.skills.memory:recall_memory",
+    ),
+]
+
+
+class SkillRegistry:
+    def __init__(self, skills: Optional[List[Skill]] = None) -> None:
+        self.skills: Dict[str, Skill] = {}
+        self._functions: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+        for skill in skills or []:
+            self.register(skill)
+
+    def register(self, skill: Skill) -> None:
+        if skill.name in self.skills:
+            print(f"[Skills] Replacing skill {skill.name!r}")
+        self.skills[skill.name] = skill
+        # Loaded functions are cached by entry point, not by skill name
+        with self._lock:
+            self._functions.pop(skill.entry_point, None)
+
+    def intents(self) -> List[Intent]:
+        return [skill.intent for skill in self.skills.values()]
+
+    def discover(self) -> None:
+        """Register skills published by installed packages under ENTRY_POINT_GROUP."""
+        from importlib import metadata
+
+        try:
+            found = metadata.entry_points(group=ENTRY_POINT_GROUP)
+        except TypeError:  # Python < 3.10
+            found = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+
+        for ep in found:
+            try:
+                loaded = ep.load()
+            except Exception as e:
+                print(f"[Skills] Could not load plugin {ep.name!r}: {e}")
+                continue
+            for skill in loaded if isinstance(loaded, (list, tuple)) else [loaded]:
+                self.register(skill)
+                print(f"[Skills] Plugin skill {skill.name!r} from {ep.value}")
+
+    def _function(self, entry_point: str) -> Callable:
+        fn = self._functions.get(entry_point)
+        if fn is None:
+            with self._lock:
+                fn = self._functions.get(entry_point)
+                if fn is None:
+                    fn = load_entry_point(entry_point)
+                    self._functions[entry_point] = fn
+        return fn
+
+    def run(self, name: str, argument: str = "") -> str:
+        """Run a skill (importing its module on first use) and return its reply."""
+        skill = self.skills[name]
+        fn = self._function(skill.entry_point)
+        if not skill.takes_argument:
+            return fn()
+        return fn(argument or skill.default_argument)
+
+    def plausible(self, name: str, argument: str, text: str = "") -> bool:
+        """Whether a fuzzy match of `text` to skill `name` should run the skill."""
+        skill = self.skills[name]
+        if skill.statements_only and is_question(text):
+            return False
+        if skill.check is None:
+            return True
+        return bool(self._function(skill.check)(argument))
+
+
+def load_registry(discover: bool = True) -> SkillRegistry:
+    registry = SkillRegistry(BUILTIN_SKILLS)
+    if discover:
+        registry.discover()
+    return registry
@@ -6,10 +6,12 @@ Basic OS-level commands + website launch for Echo.
 from __future__ import annotations
 
 import os
+import re
 import shutil
 import string
 import subprocess
 import webbrowser
+from typing import Optional
 
 
 APPS = {
@@ -104,6 +106,29 @@ APPS = {
 
 
 
+def find_app(app_name: str, whole_words: bool = False) -> Optional[str]:
+    """
+    Key in APPS for a spoken app name, or None. Loose match by default
+    ("open github.", "open my github"); `whole_words` only accepts keys that
+    appear as whole words, for guesses from fuzzy phrasing.
+    """
+    app_name = app_name.lower().strip().strip(string.punctuation)
+    for key in APPS:
+        if key == app_name:
+            return key
+        if whole_words:
+            if re.search(r"(?<!\w)" + re.escape(key) + r"(?!\w)", app_name):
+                return key
+        elif key in app_name:
+            return key
+    return None
+
+
+def is_app_name(text: str) -> bool:
+    """True if `text` names a known app / site (used to vet fuzzy "open ..." guesses)."""
+    return find_app(text, whole_words=True) is not None
+
+
 def open_app(app_name: str) -> str:
     """
     Open a desktop app or website based on a simple name.
@@ -118,30 +143,30 @@ def open_app(app_name: str) -> str:
     # strip trailing punctuation like "." from STT
     app_name = app_name.strip(string.punctuation)
 
-    for key, target in APPS.items():
-        # loose match: "open github.", "open my github", etc.
-        if key == app_name or key in app_name:
-            # URL → open via browser
-            if target.startswith("http://") or target.startswith("https://"):
-                webbrowser.open(target)
-                return f"Opening {key} in browser."
-
-            # Windows URI schemes (settings:, camera:, etc.)
-            if target.endswith(":") and ":\\" not in target:
-                # use start so Windows handles the URI
-                subprocess.Popen(["start", "", target], shell=True)
-                return f"Opening {key}"
-
-            # If it's a full file path and exists
-            if os.path.isabs(target) and os.path.exists(target):
-                subprocess.Popen([target])
-                return f"Opening {key}"
-
-            # If it's just a command name and is in PATH
-            if shutil.which(target):
-                subprocess.Popen([target])
-                return f"Opening {key}"
-
-            return f"Couldn't open {key}. File or command not found."
-
-    return f"I don't know how to open {app_name} yet."
+    key = find_app(app_name)
+    if key is None:
+        return f"I don't know how to open {app_name} yet."
+    target = APPS[key]
+
+    # URL → open via browser
+    if target.startswith("http://") or target.startswith("https://"):
+        webbrowser.open(target)
+        return f"Opening {key} in browser."
+
+    # Windows URI schemes (settings:, camera:, etc.)
+    if target.endswith(":") and ":\\" not in target:
+        # use start so Windows handles the URI
+        subprocess.Popen(["start", "", target], shell=True)
+        return f"Opening {key}"
+
+    # If it's a full file path and exists
+    if os.path.isabs(target) and os.path.exists(target):
+        subprocess.Popen([target])
+        return f"Opening {key}"
+
+    # If it's just a command name and is in PATH
+    if shutil.which(target):
+        subprocess.Popen([target])
+        return f"Opening {key}"
+
+    return f"Couldn't open {key}. File or command not found."
@@ -0,0 +1,208 @@
+"""
+vectors.py
+Optional local embedding index for semantic recall over memory facts and
+notes ("my sister's birthday" finds "Anna's birthday is March 3").
+
+Enabled by setting RECALL_EMBED_MODEL to a sentence-transformers model name
+(e.g. "all-MiniLM-L6-v2"); everything stays on this machine.
+
+Storage, per index (data/<name>.*):
+- <name>.f16  row-major float16 matrix of unit-length embeddings, appended
+              to on every new fact / note and memory-mapped for search
+- <name>.ids  int64 row ids (same order), pointing back into SQLite
+- <name>.json the model name and dimension the matrix was built with
+Search is a chunked matrix-vector product (cosine) plus a partial sort.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RECALL_EMBED_MODEL = os.getenv("RECALL_EMBED_MODEL", "")
+RECALL_MIN_SCORE = float(os.getenv("RECALL_MIN_SCORE", "0.35"))
+
+_CHUNK_ROWS = 16_384   # rows per matmul chunk, bounds float32 scratch memory
+
+_indexes: Dict[str, "VectorIndex"] = {}
+_indexes_lock = threading.Lock()
+
+
+class VectorIndex:
+    def __init__(self, path: str, model_name: str) -> None:
+        self.path = path
+        self.model_name = model_name
+        self.dim: Optional[int] = None
+        self._embedder = None
+        self._matrix = None   # np.memmap, reopened after appends
+        self._ids = None
+        self._lock = threading.Lock()
+        self._load_meta()
+
+    # ---- Files ----
+
+    @property
+    def _vec_path(self) -> str:
+        return self.path + ".f16"
+
+    @property
+    def _ids_path(self) -> str:
+        return self.path + ".ids"
+
+    @property
+    def _meta_path(self) -> str:
+        return self.path + ".json"
+
+    def _load_meta(self) -> None:
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if meta.get("model") == self.model_name:
+            self.dim = int(meta["dim"])
+        else:
+            print(f"[Vectors] Embedding model changed; rebuilding {self.path}")
+            self._reset()
+
+    def _reset(self) -> None:
+        for p in (self._vec_path, self._ids_path, self._meta_path):
+            if os.path.exists(p):
+                os.remove(p)
+        self.dim = None
+        self._matrix = self._ids = None
+
+    @property
+    def count(self) -> int:
+        """Complete rows on disk (a torn append is ignored)."""
+        if self.dim is None or not os.path.exists(self._vec_path):
+            return 0
+        rows = os.path.getsize(self._vec_path) // (2 * self.dim)
+        ids = os.path.getsize(self._ids_path) // 8 if os.path.exists(self._ids_path) else 0
+        return min(rows, ids)
+
+    # ---- Embedding ----
+
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        if self._embedder is None:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"[Vectors] Loading embedding model {self.model_name!r}")
+            self._embedder = SentenceTransformer(self.model_name, device="cpu")
+        vectors = self._embedder.encode(list(texts), batch_size=32, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    # ---- Updates ----
+
+    def add(self, ids: Sequence[int], texts: Sequence[str]) -> None:
+        if not ids:
+            return
+        vectors = self._embed(texts)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self._meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            self._matrix = self._ids = None   # release the maps before touching the files
+            # Trim a torn append before adding to the end
+            count = self.count
+            for p, width in ((self._vec_path, 2 * self.dim), (self._ids_path, 8)):
+                if os.path.exists(p) and os.path.getsize(p) != count * width:
+                    with open(p, "r+b") as f:
+                        f.truncate(count * width)
+            with open(self._vec_path, "ab") as f:
+                f.write(vectors.astype(np.float16).tobytes())
+            with open(self._ids_path, "ab") as f:
+                f.write(np.asarray(ids, dtype=np.int64).tobytes())
+
+    def last_id(self) -> int:
+        count = self.count
+        if not count:
+            return 0
+        with open(self._ids_path, "rb") as f:
+            f.seek((count - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+
+    def sync(self, rows_after: Callable[[int], Iterable[Tuple[int, str]]], batch: int = 256) -> None:
+        """Embed rows the index hasn't seen yet (e.g. facts stored before it existed)."""
+        pending: List[Tuple[int, str]] = list(rows_after(self.last_id()))
+        for start in range(0, len(pending), batch):
+            chunk = pending[start:start + batch]
+            self.add([i for i, _ in chunk], [t for _, t in chunk])
+
+    # ---- Search ----
+
+    def _open(self):
+        if self._matrix is None:
+            count = self.count
+            if not count:
+                return None, None
+            self._matrix = np.memmap(self._vec_path, dtype=np.float16, mode="r", shape=(count, self.dim))
+            self._ids = np.memmap(self._ids_path, dtype=np.int64, mode="r", shape=(count,))
+        return self._matrix, self._ids
+
+    def search(self, text: str, k: int = 5, min_score: float = RECALL_MIN_SCORE) -> List[Tuple[int, float]]:
+        """Top-k (id, cosine) pairs above `min_score`, best first."""
+        with self._lock:
+            matrix, ids = self._open()
+        if matrix is None:
+            return []
+
+        query = self._embed([text])[0]
+        scores = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), _CHUNK_ROWS):
+            block = np.asarray(matrix[start:start + _CHUNK_ROWS], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] >= min_score]
+
+
+def get_index(path: str) -> Optional[VectorIndex]:
+    """Shared index at `path`, or None when vector recall is disabled."""
+    if not RECALL_EMBED_MODEL:
+        return None
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = VectorIndex(path, RECALL_EMBED_MODEL)
+            _indexes[path] = index
+        return index
+
+
+def hybrid_search(
+    index: VectorIndex,
+    query: str,
+    keyword_rows: List[Dict],
+    fetch: Callable[[List[int]], List[Dict]],
+    limit: int = 5,
+) -> List[Dict]:
+    """
+    Merge keyword (FTS) results with semantic neighbours of `query`.
+    `fetch` loads rows (dicts with an "id") for ids the keyword search missed.
+    """
+    hits = [row_id for row_id, _ in index.search(query, k=limit)]
+    if not hits:
+        return keyword_rows
+    by_id = {row["id"]: row for row in keyword_rows}
+    missing = [row_id for row_id in hits if row_id not in by_id]
+    if missing:
+        by_id.update({row["id"]: row for row in fetch(missing)})
+    ranked = fuse([row["id"] for row in keyword_rows], hits)
+    return [by_id[row_id] for row_id in ranked if row_id in by_id][:limit]
+
+
+def fuse(*rankings: Sequence[int], k: int = 60) -> List[int]:
+    """Merge ranked id lists with reciprocal-rank fusion (best first)."""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row_id in enumerate(ranking):
+            scores[row_id] = scores.get(row_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
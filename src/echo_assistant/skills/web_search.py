@@ -6,6 +6,13 @@ Opens Google search or direct site.
 import webbrowser
 import urllib.parse
 
+from ..core.classifier import clauses, starts_with_verb
+
+
+def is_search_query(text: str) -> bool:
+    """True if `text` looks like a search query (used to vet fuzzy "google ..." guesses)."""
+    return bool(text.strip()) and len(clauses(text)) == 1 and not starts_with_verb(text)
+
 
 def search_web(query: str) -> str:
     q = urllib.parse.quote_plus(query)
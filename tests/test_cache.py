@@ -0,0 +1,121 @@
+"""Response cache: hits, expiry, eviction, persistence, and follow-up questions."""
+
+import pytest
+
+from echo_assistant.core import cache as cache_module
+from echo_assistant.core.brain import Brain, BrainConfig
+from echo_assistant.core.cache import ResponseCache, is_cacheable, normalize
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_normalize_and_volatile_questions():
+    assert normalize("Hey, what can you do please?") == "what can you do"
+    assert is_cacheable("what can you do")
+    assert not is_cacheable("what's the latest news")
+    assert not is_cacheable("explain it again")
+
+
+def test_hit_miss_and_namespace(fake_time):
+    c = ResponseCache(path=None)
+    assert c.get("perplexity:sonar", "what can you do") is None
+    c.put("perplexity:sonar", "What can you do?", "Lots.")
+    assert c.get("perplexity:sonar", "what can you do please") == "Lots."
+    assert c.get("ollama:llama3.2", "what can you do") is None
+    assert (c.hits, c.misses) == (1, 2)
+
+
+def test_entries_expire_after_ttl(fake_time):
+    c = ResponseCache(path=None, ttl_seconds=60)
+    c.put("ns", "capital of france", "Paris.")
+    fake_time.now += 59
+    assert c.get("ns", "capital of france") == "Paris."
+    fake_time.now += 2
+    assert c.get("ns", "capital of france") is None
+    assert c.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(fake_time):
+    c = ResponseCache(path=None, max_entries=2)
+    c.put("ns", "one", "1")
+    c.put("ns", "two", "2")
+    c.get("ns", "one")            # "two" is now the oldest
+    c.put("ns", "three", "3")
+    assert c.get("ns", "two") is None
+    assert c.get("ns", "one") == "1"
+    assert c.evictions == 1
+
+
+def test_persists_in_one_batched_write(tmp_path, fake_time, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    c = ResponseCache(path=path, save_delay_seconds=60)
+    saves = []
+    real_save = c.save
+    monkeypatch.setattr(c, "save", lambda: (saves.append(1), real_save()))
+
+    c.put("ns", "one", "1")
+    c.put("ns", "two", "2")
+    assert saves == []            # nothing written on the caller's thread
+    c.flush()
+    assert saves == [1]
+    c.flush()                     # nothing pending
+    assert saves == [1]
+
+    reloaded = ResponseCache(path=path)
+    assert reloaded.get("ns", "two") == "2"
+
+    fake_time.now += 7200         # past the default TTL: dropped on load
+    assert ResponseCache(path=path).get("ns", "two") is None
+
+
+@pytest.fixture
+def brain(monkeypatch):
+    b = Brain(BrainConfig(backend="perplexity", cache_enabled=False))
+    b.cache = ResponseCache(path=None)
+    calls = []
+
+    def fake_backend(backend, user_text):
+        calls.append(user_text)
+        return f"reply {len(calls)}"
+
+    monkeypatch.setattr(b, "_call_backend", fake_backend)
+    b.calls = calls
+    return b
+
+
+def test_brain_reuses_answers_to_fresh_questions(brain):
+    brain.context.clear()
+    assert brain.generate_reply("what can you do") == "reply 1"
+    brain.context.clear()         # a new conversation
+    assert brain.generate_reply("what can you do") == "reply 1"
+    assert brain.calls == ["what can you do"]
+
+
+def test_brain_skips_cache_for_follow_ups(brain):
+    brain.generate_reply("tell me about the eiffel tower")
+    assert brain.generate_reply("why") == "reply 2"
+    assert brain.generate_reply("and in French") == "reply 3"
+    assert brain.cache.stats()["entries"] == 1   # only the opening question
+
+    brain.context.clear()
+    assert brain.generate_reply("why") == "reply 4"   # not answered from the follow-up
+
+
+def test_brain_uses_cache_again_after_a_pause(brain):
+    brain.generate_reply("what can you do")
+    brain.generate_reply("what is a haiku")
+    brain._last_turn_at -= brain.config.cache_context_seconds + 1
+    assert brain.generate_reply("what can you do") == "reply 1"
@@ -0,0 +1,75 @@
+"""Token-budgeted conversation context: estimates, compaction and prompt building."""
+
+from echo_assistant.core.context import (
+    MESSAGE_OVERHEAD_TOKENS,
+    ConversationContext,
+    Message,
+    estimate_tokens,
+)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a b c d e") == 5             # at least one per word
+    assert estimate_tokens("x" * 40) == 10               # ~4 characters per token
+    assert Message("user", "x" * 40).tokens == 10 + MESSAGE_OVERHEAD_TOKENS
+
+
+def test_under_budget_keeps_every_turn():
+    ctx = ConversationContext("sys", budget=1000)
+    ctx.add_turn("hello", "hi there")
+    ctx.add_turn("how are you", "fine")
+    assert [m.content for m in ctx.turns] == ["hello", "hi there", "how are you", "fine"]
+    assert ctx.summary_lines == []
+
+
+def test_oldest_turns_are_compacted_into_the_summary():
+    ctx = ConversationContext("sys", budget=60, assistant_name="Echo")
+    ctx.add_turn("Tell me about Paris. It is big.", "Paris is the capital of France. " * 3)
+    ctx.add_turn("and Rome?", "Rome is the capital of Italy.")
+    assert ctx.tokens() <= 60
+    assert [m.content for m in ctx.turns] == ["and Rome?", "Rome is the capital of Italy."]
+    assert ctx.summary_lines == [
+        "- User: Tell me about Paris. / Echo: Paris is the capital of France."
+    ]
+    assert "Summary of the earlier conversation" in ctx.system_message().content
+
+
+def test_summary_is_capped_oldest_first():
+    ctx = ConversationContext("sys", budget=60, summary_tokens=30)
+    for i in range(5):
+        ctx.add_turn(f"question number {i}", f"answer number {i}")
+    assert [m.content for m in ctx.turns] == ["question number 4", "answer number 4"]
+    assert ctx.summary_lines == [
+        "- User: question number 2 / Assistant: answer number 2",
+        "- User: question number 3 / Assistant: answer number 3",
+    ]
+    assert estimate_tokens(ctx.summary) <= 30
+    assert ctx.tokens() <= 60
+
+
+def test_build_keeps_newest_whole_pairs_within_budget():
+    ctx = ConversationContext("sys", budget=1000)
+    for i in range(4):
+        ctx.add_turn(f"question {i}", f"answer {i}")
+
+    everything = ctx.build("next")
+    assert [m["content"] for m in everything][1:] == [
+        "question 0", "answer 0", "question 1", "answer 1",
+        "question 2", "answer 2", "question 3", "answer 3", "next",
+    ]
+
+    pair = Message("user", "question 3").tokens + Message("assistant", "answer 3").tokens
+    fixed = ctx.system_message().tokens + Message("user", "next").tokens
+    tight = ctx.build("next", budget=fixed + pair)
+    assert [m["role"] for m in tight] == ["system", "user", "assistant", "user"]
+    assert [m["content"] for m in tight][1:] == ["question 3", "answer 3", "next"]
+
+
+def test_clear_forgets_turns_and_summary():
+    ctx = ConversationContext("sys", budget=30)
+    for i in range(4):
+        ctx.add_turn(f"question number {i}", f"answer number {i}")
+    ctx.clear()
+    assert ctx.turns == [] and ctx.summary_lines == []
+    assert ctx.build("hi") == [{"role": "system", "content": "sys"}, {"role": "user", "content": "hi"}]
@@ -0,0 +1,94 @@
+"""Backend ordering, cool-down and hedging (BackendSelector, Brain failover)."""
+
+import asyncio
+
+import pytest
+
+from echo_assistant.core.brain import Brain, BrainConfig
+from echo_assistant.core.failover import BackendSelector
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_failed_backend_cools_down_then_returns(clock):
+    selector = BackendSelector("perplexity", ["ollama"], cooldown_seconds=30.0, clock=clock)
+    assert selector.candidates() == ["perplexity", "ollama"]
+
+    selector.record_failure("perplexity")
+    assert selector.candidates() == ["ollama", "perplexity"]
+
+    clock.now += 31.0
+    assert selector.candidates() == ["perplexity", "ollama"]
+    selector.record_success("perplexity", 0.5)
+    assert selector.stats["perplexity"].consecutive_failures == 0
+
+
+def test_high_error_rate_goes_behind_reliable_backends(clock):
+    selector = BackendSelector("perplexity", ["ollama"], cooldown_seconds=1.0, min_samples=4, clock=clock)
+    for ok in (False, True, False, False):
+        if ok:
+            selector.record_success("perplexity", 0.5)
+        else:
+            selector.record_failure("perplexity")
+    clock.now += 5.0   # out of cool-down, but still failing 3 times in 4
+    assert selector.stats["perplexity"].error_rate == 0.75
+    assert selector.candidates() == ["ollama", "perplexity"]
+
+
+def test_hedge_delay_uses_p95_capped_by_setting(clock):
+    selector = BackendSelector("perplexity", ["ollama"], hedge_after_seconds=4.0, min_samples=3, clock=clock)
+    assert selector.hedge_delay("perplexity") == 4.0   # not enough history yet
+    for latency in (0.5, 0.6, 0.7, 0.8, 1.0):
+        selector.record_success("perplexity", latency)
+    assert selector.hedge_delay("perplexity") == 1.0
+    for _ in range(20):
+        selector.record_success("perplexity", 9.0)
+    assert selector.hedge_delay("perplexity") == 4.0
+
+
+def test_hedging_disabled_without_a_fallback(clock):
+    assert BackendSelector("perplexity", [], hedge_after_seconds=4.0, clock=clock).hedge_delay("perplexity") is None
+    assert BackendSelector("perplexity", ["ollama"], clock=clock).hedge_delay("perplexity") is None
+
+
+def test_abandoned_backend_is_demoted(clock):
+    selector = BackendSelector("perplexity", ["ollama"], hedge_after_seconds=2.0, min_samples=1, clock=clock)
+    selector.record_success("perplexity", 0.4)
+    selector.record_abandoned("perplexity", 2.0)
+    assert selector.stats["perplexity"].p95 == 2.0
+    assert selector.candidates() == ["ollama", "perplexity"]
+
+
+def test_hedge_loser_is_recorded(monkeypatch):
+    brain = Brain(BrainConfig(
+        backend="perplexity", fallbacks=["ollama"], hedge_after_seconds=0.05, cache_enabled=False,
+    ))
+
+    async def fake_stream(backend, user_text, deadline):
+        if backend == "perplexity":
+            await asyncio.sleep(5)   # stalled primary
+        yield f"{backend} reply"
+
+    monkeypatch.setattr(brain, "_astream_backend", fake_stream)
+
+    async def ask():
+        backend, first, pieces = await brain._afirst_reply("hello there", None)
+        await pieces.aclose()
+        return backend, first
+
+    assert asyncio.run(ask()) == ("ollama", "ollama reply")
+    stats = brain.selector.stats["perplexity"]
+    assert list(stats.outcomes) == [False]
+    assert stats.latencies[0] >= 0.05
+    assert brain.selector.candidates()[0] == "ollama"
@@ -0,0 +1,87 @@
+"""Fuzzy intent matching: commands run skills, questions and chat go to the Brain."""
+
+import pytest
+
+from echo_assistant.core.classifier import IntentClassifier, is_question
+from echo_assistant.skills.registry import load_registry
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return load_registry(discover=False)
+
+
+@pytest.fixture(scope="module")
+def classifier(registry):
+    return IntentClassifier(registry.intents())
+
+
+def runs(registry, classifier, text):
+    match = classifier.classify(text)
+    if match is None or not registry.plausible(match.intent.name, match.argument, text):
+        return None
+    return match.intent.name
+
+
+def test_is_question():
+    assert is_question("why is it hard to keep in mind names")
+    assert is_question("my sister's birthday?")
+    assert not is_question("jot down buy milk")
+
+
+@pytest.mark.parametrize("text", [
+    "can you remember my sister's birthday?",
+    "why is it hard to keep in mind names",
+    "how do you jot down chords",
+])
+def test_questions_fall_through_to_brain(registry, classifier, text):
+    assert runs(registry, classifier, text) not in ("store_memory", "add_note")
+
+
+@pytest.mark.parametrize("text", [
+    "google has how many employees",
+    "put on your thinking cap and tell me a riddle",
+    "keep in mind I am asking for a friend, how do I fix a tire",
+    "I need to write down my goals, any tips",
+])
+def test_chat_starting_with_a_cue_falls_through(registry, classifier, text):
+    assert runs(registry, classifier, text) is None
+
+
+def test_long_multi_clause_arguments_score_lower(classifier):
+    short = classifier.classify("jot down buy milk")
+    listed = classifier.classify("jot down buy milk, eggs and bread")
+    assert listed.score < short.score
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("jot down buy milk", "add_note"),
+    ("jot down buy milk, eggs and bread", "add_note"),
+    ("don't let me forget the keys", "store_memory"),
+    ("keep in mind that my wifi password is hunter2", "store_memory"),
+    ("put on some rock and roll", "play"),
+    ("can you play some lofi beats for me", "play"),
+    ("look up the weather in paris", "search_web"),
+    ("google how tall is everest", "search_web"),
+    ("could you open firefox for me", "open_app"),
+])
+def test_commands_still_match(registry, classifier, text, intent):
+    assert runs(registry, classifier, text) == intent
+
+
+def test_reregistering_a_skill_reloads_its_function(monkeypatch):
+    from echo_assistant.skills import registry as registry_module
+
+    registry = registry_module.SkillRegistry()
+    loaded = []
+
+    def fake_load(entry_point):
+        loaded.append(entry_point)
+        return lambda argument: f"v{len(loaded)}: {argument}"
+
+    monkeypatch.setattr(registry_module, "load_entry_point", fake_load)
+    skill = registry_module.Skill(registry_module.Intent("echo"), "plugin.module:echo")
+    registry.register(skill)
+    assert registry.run("echo", "hi") == "v1: hi"
+    registry.register(skill)
+    assert registry.run("echo", "hi") == "v2: hi"
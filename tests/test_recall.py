@@ -0,0 +1,134 @@
+"""Keyword recall over memory facts and notes (SQLite FTS5)."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from echo_assistant.skills import db, memory, notes
+
+
+@pytest.fixture
+def memory_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(memory, "MEMORY_DB", str(tmp_path / "memory.db"))
+    monkeypatch.setattr(memory, "MEMORY_PATH", str(tmp_path / "memory.json"))
+    monkeypatch.setattr(memory, "_ready", False)
+    monkeypatch.delenv("RECALL_EMBED_MODEL", raising=False)
+    yield
+    db.close(memory.MEMORY_DB)
+
+
+@pytest.fixture
+def notes_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(notes, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(notes, "NOTES_DB", str(tmp_path / "notes.db"))
+    monkeypatch.setattr(notes, "NOTES_PATH", str(tmp_path / "notes.txt"))
+    monkeypatch.setattr(notes, "_ready", False)
+    monkeypatch.delenv("RECALL_EMBED_MODEL", raising=False)
+    yield
+    db.close(notes.NOTES_DB)
+
+
+def test_tokens_drop_possessives_and_single_letters():
+    assert db.tokens("my sister's birthday") == ["sister", "birthday"]
+    assert db.tokens("Anna’s plan B") == ["anna", "plan"]
+
+
+def test_fts_query_prefixes_only_longer_terms():
+    assert db.fts_query("my sister's birthday") == '"sister"* OR "birthday"*'
+    assert db.fts_query("tv at 9pm", mode="and") == '"tv" AND "9pm"*'
+
+
+def test_fts_query_keeps_phrases_and_escapes_syntax():
+    assert db.fts_query('"sister\'s birthday" NEAR(x)') == (
+        '"sister s birthday" OR "near"*'
+    )
+    assert db.fts_query("what is the") == ""
+
+
+FACTS = [
+    "My sister's birthday is March 3",
+    "Sam likes sushi",
+    "Buy soap and socks",
+    "Server password rotates Sunday",
+    "My birthday is in July",
+    "My sister lives in Pune",
+]
+
+
+def test_recall_prefers_facts_with_every_word(memory_db):
+    for fact in FACTS:
+        memory.store_memory(fact)
+
+    found = [m["fact"] for m in memory.search_memory("my sister's birthday")]
+    assert found == ["My sister's birthday is March 3"]
+
+
+def test_recall_falls_back_to_any_word(memory_db):
+    for fact in FACTS:
+        memory.store_memory(fact)
+
+    found = [m["fact"] for m in memory.search_memory("sister's wedding")]
+    assert set(found) == {"My sister's birthday is March 3", "My sister lives in Pune"}
+    assert memory.recall_memory("quantum physics") == (
+        "I don't remember anything about quantum physics."
+    )
+
+
+def test_note_search_ranks_matches(notes_db):
+    for text in ("call the plumber", "plumber quote was 200", "buy milk"):
+        notes.add_note(text)
+
+    total, rows = notes.find_notes("plumber quote")
+    assert total == 1
+    assert rows[0]["text"] == "plumber quote was 200"
+
+
+def _from_threads(fn, count=4):
+    barrier = threading.Barrier(count)
+
+    def run():
+        barrier.wait()
+        fn()
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_legacy_memory_is_imported_once_under_concurrency(memory_db, monkeypatch):
+    with open(memory.MEMORY_PATH, "w", encoding="utf-8") as f:
+        json.dump([{"timestamp": "2024-01-01 09:00", "fact": "Sam likes sushi"}], f)
+    calls = []
+    migrate = memory._migrate_json
+
+    def slow_migrate(conn):
+        calls.append(1)
+        time.sleep(0.05)
+        migrate(conn)
+
+    monkeypatch.setattr(memory, "_migrate_json", slow_migrate)
+    _from_threads(memory._db)
+    assert calls == [1]
+    assert memory._db().execute("SELECT COUNT(*) FROM facts").fetchone()[0] == 1
+
+
+def test_legacy_notes_are_imported_once_under_concurrency(notes_db, monkeypatch):
+    with open(notes.NOTES_PATH, "w", encoding="utf-8") as f:
+        f.write("[2024-01-01 09:00] call the plumber\n")
+    calls = []
+    migrate = notes._migrate_txt
+
+    def slow_migrate(conn):
+        calls.append(1)
+        time.sleep(0.05)
+        migrate(conn)
+
+    monkeypatch.setattr(notes, "_migrate_txt", slow_migrate)
+    _from_threads(notes._db)
+    assert calls == [1]
+    assert notes._db().execute("SELECT COUNT(*) FROM notes").fetchone()[0] == 1
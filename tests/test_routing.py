@@ -0,0 +1,40 @@
+"""Literal intent table: longer and higher-priority triggers win over shorter ones."""
+
+import pytest
+
+from echo_assistant.core.intents import IntentMatcher
+from echo_assistant.core.router import EXIT_INTENT
+from echo_assistant.skills.registry import load_registry
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return IntentMatcher([EXIT_INTENT] + load_registry(discover=False).intents())
+
+
+@pytest.mark.parametrize("text, intent, argument", [
+    ("remember that my sister's birthday is March 3", "store_memory", "my sister's birthday is March 3"),
+    ("search my notes for plumber", "search_notes", "plumber"),
+    ("search for cheap flights", "search_web", "cheap flights"),
+    ("open my notes", "list_notes", ""),
+    ("open firefox", "open_app", "firefox"),
+    ("what do you remember about my car", "recall_memory", "my car"),
+])
+def test_longest_trigger_wins(matcher, text, intent, argument):
+    match = matcher.match(text)
+    assert match.intent.name == intent
+    if argument:
+        assert match.argument == argument
+
+
+@pytest.mark.parametrize("text", [
+    "exit assistant",
+    "okay that's all, exit assistant",
+    "please stop assistant now",
+])
+def test_exit_phrase_counts_anywhere(matcher, text):
+    assert matcher.match(text).intent.name == "exit"
+
+
+def test_no_trigger_is_no_match(matcher):
+    assert matcher.match("tell me a joke") is None